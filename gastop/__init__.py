@@ -7,6 +7,8 @@ This module imports the main classes so they are available at the top level of t
 """
 
 from gastop.truss import Truss
+from gastop.materials import MaterialTable
+from gastop.population import Population
 from gastop.evaluator import Evaluator
 from gastop.crossover import Crossover
 from gastop.mutator import Mutator
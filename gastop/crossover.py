@@ -6,7 +6,7 @@ This module implements the Crossover class.
 
 """
 import numpy as np
-from gastop import Truss
+from gastop import Truss, Population
 
 
 class Crossover():
@@ -117,6 +117,63 @@ class Crossover():
 
         return child_1, child_2
 
+    @staticmethod
+    def uniform_crossover_population(parents_1, parents_2):
+        '''Performs a uniform crossover on pairs of stacked parents.
+
+        Population-level variant of :meth:`uniform_crossover`. Each element
+        of each child is taken from either of its parents with equal
+        probability, independently of all other elements, so all pairs are
+        combined with a single random mask.
+
+        Args:
+            parents_1 (ndarray): Stacked arrays of the first parent of each
+                pair, shape (num_pairs, ...).
+            parents_2 (ndarray): Stacked arrays of the second parent of each
+                pair, same shape as *parents_1*.
+
+        Returns:
+            children_1, children_2 (ndarrays): Stacked arrays of the first and
+            second child of each pair.
+
+        '''
+        mask = np.random.randint(2, size=np.shape(parents_1)).astype(bool)
+        children_1 = np.where(mask, parents_1, parents_2)
+        children_2 = np.where(mask, parents_2, parents_1)
+
+        return children_1, children_2
+
+    @staticmethod
+    def single_point_split_population(arrays_1, arrays_2):
+        '''Performs a single point split crossover on pairs of stacked parents.
+
+        Population-level variant of :meth:`single_point_split`. A random
+        split point is chosen for each pair, and the rows of the parents
+        before the split point are swapped between the children.
+
+        Args:
+            arrays_1 (ndarray): Stacked arrays of the first parent of each
+                pair, shape (num_pairs, num_rows, ...).
+            arrays_2 (ndarray): Stacked arrays of the second parent of each
+                pair, same shape as *arrays_1*.
+
+        Returns:
+            children_1, children_2 (ndarrays): Stacked arrays of the first and
+            second child of each pair.
+
+        '''
+
+        num_pairs, num_rows = np.shape(arrays_1)[:2]
+        points = np.random.randint(0, num_rows, size=num_pairs)
+
+        # rows before the split point come from the first parent
+        mask = np.arange(num_rows) < points[:, np.newaxis]
+        mask = mask.reshape(mask.shape + (1,)*(np.ndim(arrays_1) - 2))
+        children_1 = np.where(mask, arrays_1, arrays_2)
+        children_2 = np.where(mask, arrays_2, arrays_1)
+
+        return children_1, children_2
+
     @staticmethod
     def two_points_split(array_1, array_2):  # Amlan
         '''Takes specific values of two parents and return two children containing
@@ -152,6 +209,54 @@ class Crossover():
 
         return child_1, child_2
 
+    def cross_population(self, population, parents):
+        """Combines pairs of trusses in a population to produce children.
+
+        Equivalent to calling the Crossover object on each pair of parents,
+        but all children are produced at once from the stacked arrays of the
+        population, using the population-level variant of each method, such
+        as :meth:`uniform_crossover_population`, if there is one.
+
+        Args:
+            population (Population): Population to select parents from.
+            parents (ndarray): Indices of parents in *population*, as returned
+                by a Selector. Consecutive entries are paired, so the length
+                should be even.
+
+        Returns:
+            children (Population): Children of each pair of parents, in the
+            order [child_1 of pair 1, child_2 of pair 1, child_1 of pair 2, ...].
+
+        """
+
+        parents = np.asarray(parents, dtype=int)
+        parents_1, parents_2 = parents[0::2], parents[1::2]
+        children = []
+        for name, method, params in (
+                ('rand_nodes', self.node_method, self.params['node_crossover_params']),
+                ('edges', self.edge_method, self.params['edge_crossover_params']),
+                ('properties', self.property_method, self.params['property_crossover_params'])):
+            arrays = getattr(population, name)
+            pop_method = getattr(self, method.__name__ + '_population', None)
+            if pop_method is not None:
+                children_1, children_2 = pop_method(
+                    arrays[parents_1], arrays[parents_2], **params)
+            else:
+                pairs = [method(arrays[i].copy(), arrays[j].copy(), **params)
+                         for i, j in zip(parents_1, parents_2)]
+                children_1 = np.array([pair[0] for pair in pairs]).reshape(
+                    (len(pairs),) + arrays.shape[1:])
+                children_2 = np.array([pair[1] for pair in pairs]).reshape(
+                    (len(pairs),) + arrays.shape[1:])
+            # interleave, so each pair's children are next to each other
+            child_arrays = np.empty((parents.size,) + arrays.shape[1:],
+                                    dtype=np.result_type(children_1, children_2))
+            child_arrays[0::2] = children_1
+            child_arrays[1::2] = children_2
+            children.append(child_arrays)
+
+        return Population(self.params['user_spec_nodes'], *children)
+
     def __call__(self, truss_1, truss_2):
         """Calls a crossover object on two trusses to combine them.
 
@@ -8,7 +8,8 @@ This module contains the ConfigEncoder and PopulationEncoder classes.
 import numpy as np
 import json
 
-from gastop import Truss
+from gastop import Truss, Population
+from gastop.population import TrussView
 
 
 class ConfigEncoder(json.JSONEncoder):
@@ -31,11 +32,17 @@ class PopulationEncoder(json.JSONEncoder):
 
     If the object is a numpy array, converts it to a list and appends
     '__numpy__' metadata for decoding. Handles that population is composed
-    of truss objects.
+    of truss objects, either as a list or a Population.
     '''
     def default(self, obj):
+        if isinstance(obj, Population):
+            return obj.to_trusses()
+        if isinstance(obj, TrussView):
+            obj = obj.copy()
         if isinstance(obj, Truss):
-            a = obj.__dict__
+            # private attributes such as cached factorizations aren't saved
+            a = {key: val for key, val in obj.__dict__.items()
+                 if not key.startswith('_')}
             for key, val in a.items():
                 if type(val).__module__ == np.__name__:
                     if isinstance(val, np.ndarray):
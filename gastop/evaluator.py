@@ -5,7 +5,21 @@ Licensed under GNU GPLv3.
 This module implements the Evaluator class.
 
 """
+import collections
+import hashlib
+import inspect
+import warnings
 import numpy as np
+import scipy.linalg
+import scipy.sparse
+import scipy.sparse.csgraph
+import scipy.sparse.linalg
+from gastop import Truss, MaterialTable, kernels
+from gastop.obstacles import Obstacles
+
+# pivots of a factorization smaller than this, relative to the largest
+# diagonal entry of the matrix, mean the matrix is numerically singular
+_PIVOT_TOL = 1e-12
 
 
 class Evaluator():
@@ -24,7 +38,13 @@ class Evaluator():
                  interferences_solver,
                  cost_solver,
                  boundary_conditions,
-                 properties_dict):
+                 properties_dict,
+                 cache_size=0,
+                 struct_solver_params=None,
+                 prune_unloaded=False,
+                 jit=False,
+                 interferences_solver_params=None,
+                 crossing_clearance=None):
         """Creates an Evaluator callable object.
 
         Once created, the Evaluator can be called on a Truss object to
@@ -78,6 +98,30 @@ class Evaluator():
                 - ``'dens'``: Density of the material, in kilograms per cubic meter.
             cost_solver (str): Name of the method to be used to calculate cost.
                 e.g. ``'cost_calc'``.
+            cache_size (float): Maximum memory to use for caching evaluation
+                results, in megabytes. Trusses whose cleaned nodes, edges and
+                properties have already been evaluated are given the cached
+                results instead of being solved again. Least recently used
+                results are discarded first. Default 0, meaning no caching.
+            struct_solver_params (dict): Additional keyword arguments passed
+                to the struct solver, such as ``'tol'`` and ``'maxiter'`` for
+                :meth:`mat_struct_analysis_PCG`. Default None.
+            prune_unloaded (bool): Whether to remove members that can't carry
+                load before solving, see :meth:`prune_unloaded`. Default False.
+            jit (bool): Whether to use the Numba compiled kernels in
+                :mod:`gastop.kernels` for stiffness matrix assembly, stress
+                recovery and mass, in the solvers that take a ``jit``
+                argument. Falls back to the NumPy versions, with a warning, if
+                Numba isn't installed. Default False.
+            interferences_solver_params (dict): Additional keyword arguments
+                passed to the interferences solver, such as ``'obstacles'``
+                for :meth:`interference_ray_tracing`. Obstacles given as a
+                dictionary of arguments to :class:`gastop.obstacles.Obstacles`
+                are built into one once, here. Default None.
+            crossing_clearance (float): If given, member pairs that cross
+                or pass closer than this distance are found with
+                :meth:`member_crossings` and stored in the ``crossings``
+                attribute of each truss. Default None, meaning no check.
 
         Returns:
             callable Evaluator object.
@@ -90,15 +134,43 @@ class Evaluator():
         self.boundary_conditions = boundary_conditions
         self.cost_solver = getattr(self, cost_solver)
         self.properties_dict = properties_dict
+        if struct_solver_params is None:
+            struct_solver_params = {}
+        self.jit = jit and kernels.HAS_NUMBA
+        if jit and not kernels.HAS_NUMBA:
+            warnings.warn('Numba is not installed, using NumPy kernels')
+        self.struct_solver_params = struct_solver_params
+        self.mass_solver_params = {}
+        if self.jit:
+            if 'jit' in inspect.signature(self.struct_solver).parameters:
+                self.struct_solver_params = dict(struct_solver_params, jit=True)
+            if 'jit' in inspect.signature(self.mass_solver).parameters:
+                self.mass_solver_params = {'jit': True}
+        if interferences_solver_params is None:
+            interferences_solver_params = {}
+        obstacles = interferences_solver_params.get('obstacles')
+        if isinstance(obstacles, dict):
+            interferences_solver_params = dict(
+                interferences_solver_params, obstacles=Obstacles(**obstacles))
+        self.interferences_solver_params = interferences_solver_params
+        self.crossing_clearance = crossing_clearance
+        self.prune = prune_unloaded
+        self.cache_size = cache_size
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self._cache = collections.OrderedDict()
+        self._cache_bytes = 0
 
     @staticmethod
-    def mat_struct_analysis_DSM(truss, boundary_conditions, properties_dict):
+    def mat_struct_analysis_DSM(truss, boundary_conditions, properties_dict,
+                                jit=False):
         """Calculates deflections and stresses using direct stiffness method.
 
         Constructs global stiffness matrix from nodes and connections,
         and computes deflections under each loading scenario.
         From deflections, calculates internal forces, stresses, and factor
-        of safety in each member under each loading scenario
+        of safety in each member under each loading scenario. The analysis
+        is done by :meth:`mat_struct_analysis_DSM_vectorized`.
 
         Args:
             truss (Truss object): Truss to be evaluated. Must have nodes,
@@ -141,6 +213,9 @@ class Evaluator():
                   polar axis, in meters^4.
                 - ``'dens'``: Density of the material, in kilograms per cubic meter.
 
+            jit (bool): Whether to use the compiled kernels in
+                :mod:`gastop.kernels`. Default False.
+
         Returns:
             2-element tuple containing:
 
@@ -163,73 +238,316 @@ class Evaluator():
               [dx, dy, dz, d_theta_x, d_theta_y, d_theta_z]
         """
 
-        nodes, con, matl = truss.cleaned_params()
+        return Evaluator.mat_struct_analysis_DSM_vectorized(
+            truss, boundary_conditions, properties_dict, jit=jit)
 
-        loads = boundary_conditions['loads'].copy()
-        fixtures = boundary_conditions['fixtures'].copy()
+    @staticmethod
+    def _load_case_groups(num_nodes, con, loads, fixtures):
+        """Groups loading scenarios that share the same free degrees of freedom.
 
-        eps = np.finfo(float).eps  # machine precision
+        Nodes that are neither connected to any member nor loaded in a given
+        scenario are treated as fixed, as they have no effect on the solution.
+        Scenarios with identical fixtures (after this adjustment) share the
+        same reduced stiffness matrix, so it only needs to be factored once.
+
+        Args:
+            num_nodes (int): Number of nodes in the truss.
+            con (ndarray): Array of member connections.
+            loads (ndarray): Array of loads, shape (num_nodes, dofs per node,
+                num_loads).
+            fixtures (ndarray): Array of fixtures, same shape as *loads*.
+
+        Returns:
+            groups (list): List of 2-element tuples ``(f, cases)``, where *f* is
+            an array of the global indices of the free degrees of freedom and
+            *cases* is an array of the loading scenarios sharing them. Groups
+            with no free degrees of freedom are omitted.
+        """
 
-        num_nodes = nodes.shape[0]
-        num_con = con.shape[0]
         num_loads = loads.shape[2]
 
-        # get material properties etc
-        E = properties_dict['elastic_modulus'][matl]
-        G = properties_dict['shear_modulus'][matl]
-        YS = properties_dict['yield_strength'][matl]
-        A = properties_dict['x_section_area'][matl]
-        Iz = properties_dict['moment_inertia_z'][matl]
-        Iy = properties_dict['moment_inertia_y'][matl]
-        J = properties_dict['polar_moment_inertia'][matl]
-        OD = properties_dict['outer_diameter'][matl]
-
-        # initialize empty matrices
-        # member stiffness matrices in local coords
-        Kloc = np.zeros((12, 12, num_con))
-        # member stiffness matrices in global coords
-        KlocT = np.zeros((12, 12, num_con))
-        Kglob = np.zeros((6*num_nodes, 6*num_nodes))  # global stiffness matrix
-        Q = np.zeros((num_con, 12))  # end forces on members
-        Ei = np.zeros((num_con, 12))  # local to global matrix indices
-        V = np.zeros((num_nodes, 6, num_loads))  # displacements
-        r = np.zeros((3, 3, num_con))  # member rotation matrices
-        # local to global transformation matrix
-        T = np.zeros((12, 12, num_con))
-        k1 = np.zeros((3, 3, num_con))  # stiffness matrix components
-        k2 = np.zeros((3, 3, num_con))  # stiffness matrix components
-        k3 = np.zeros((3, 3, num_con))  # stiffness matrix components
-        k4 = np.zeros((3, 3, num_con))  # stiffness matrix components
-        FoS = np.zeros((num_con, num_loads))  # factor of safety
+        # set unconnected unloaded nodes to fixed
+        connected = np.zeros(num_nodes, dtype=bool)
+        connected[con.ravel()] = True
+        unconnected = ~connected[:, np.newaxis] & ~loads.any(axis=1)
+        fixtures = np.where(unconnected[:, np.newaxis, :], 1, fixtures)
+
+        free = (fixtures != 1).reshape(-1, num_loads)
+        # a single scenario is the only group, no need to compare patterns
+        if num_loads == 1:
+            f = np.nonzero(free[:, 0])[0]
+            return [(f, np.zeros(1, dtype=int))] if f.size else []
+        patterns, inverse = np.unique(free.T, axis=0, return_inverse=True)
+        inverse = inverse.ravel()
+
+        groups = []
+        for k, pattern in enumerate(patterns):
+            f = np.nonzero(pattern)[0]
+            if f.size:
+                groups.append((f, np.nonzero(inverse == k)[0]))
+        return groups
+
+    @staticmethod
+    def _reduced_stiffness(Kel, Ei, f, num_dof, sparse=False, lower=False,
+                           jit=False):
+        """Assembles the stiffness matrix of the free degrees of freedom.
+
+        Global degree of freedom numbers are mapped to rows of the reduced
+        matrix before assembly, so member stiffness matrices are added
+        directly into it without forming the full global stiffness matrix.
+
+        Args:
+            Kel (ndarray): Member stiffness matrices in global coordinates,
+                shape (num_con, k, k).
+            Ei (ndarray): Global indices of the degrees of freedom of each
+                member, shape (num_con, k).
+            f (ndarray): Global indices of the free degrees of freedom, in
+                the order of the rows of the reduced matrix.
+            num_dof (int): Total number of degrees of freedom.
+            sparse (bool): Whether to return a sparse COO matrix, with
+                duplicate entries not yet summed, instead of a dense array.
+            lower (bool): Whether to only assemble the lower triangle, for
+                solvers that only read one triangle of the symmetric matrix.
+                Entries above the diagonal are left as zeros.
+            jit (bool): Whether to assemble a dense matrix with
+                :func:`gastop.kernels.assemble_stiffness`.
+
+        Returns:
+            K (ndarray or coo_matrix): Reduced stiffness matrix, shape
+            (f.size, f.size).
+        """
+
+        dof_map = np.full(num_dof, -1)
+        dof_map[f] = np.arange(f.size)
+        Er = dof_map[Ei]
+        if jit and not sparse:
+            return kernels.assemble_stiffness(Kel, Er, f.size, lower)
+        rows = np.broadcast_to(Er[:, :, np.newaxis], Kel.shape)
+        cols = np.broadcast_to(Er[:, np.newaxis, :], Kel.shape)
+        free = (rows >= 0) & (cols >= 0)
+        if lower:
+            free &= rows >= cols
+        if sparse:
+            return scipy.sparse.coo_matrix(
+                (Kel[free], (rows[free], cols[free])), shape=(f.size, f.size))
+        return np.bincount(rows[free]*f.size + cols[free], weights=Kel[free],
+                           minlength=f.size**2).reshape(f.size, f.size)
+
+    @staticmethod
+    def _cholesky_stack(K):
+        """Factors a stack of matrices by Cholesky factorization.
+
+        The whole stack is factored at once, and one matrix at a time only
+        if some factorization fails, so that one matrix that isn't positive
+        definite doesn't stop the others.
+
+        Args:
+            K (ndarray): Stack of symmetric matrices, shape (n, m, m).
+
+        Returns:
+            2-element tuple containing:
+
+            - **L** *(ndarray)*: Lower triangular Cholesky factors, the
+              identity where the factorization failed, shape (n, m, m).
+            - **failed** *(ndarray)*: Boolean array, True where the
+              factorization failed, shape (n,).
+        """
+
+        failed = np.zeros(K.shape[0], dtype=bool)
+        try:
+            return np.linalg.cholesky(K), failed
+        except np.linalg.LinAlgError:
+            pass
+        L = np.empty_like(K)
+        for i in range(K.shape[0]):
+            try:
+                L[i] = np.linalg.cholesky(K[i])
+            except np.linalg.LinAlgError:
+                L[i] = np.eye(K.shape[1])
+                failed[i] = True
+        return L, failed
+
+    @staticmethod
+    def _cholesky_stack_solve(L, B):
+        """Solves ``L @ L.T @ X = B`` for a stack of Cholesky factors.
+
+        Forward and back substitution are done one row at a time for the
+        whole stack, as NumPy has no batched triangular solve.
+
+        Args:
+            L (ndarray): Lower triangular factors, shape (n, m, m), as
+                returned by :meth:`_cholesky_stack`.
+            B (ndarray): Right hand sides, shape (n, m, k).
+
+        Returns:
+            X (ndarray): Solutions, shape (n, m, k).
+        """
+
+        num = L.shape[1]
+        diag = np.diagonal(L, axis1=1, axis2=2)[:, :, np.newaxis]
+        Y = np.empty(B.shape)
+        for i in range(num):
+            Y[:, i] = (B[:, i] - np.einsum('bj,bjk->bk', L[:, i, :i],
+                                           Y[:, :i]))/diag[:, i]
+        X = np.empty(B.shape)
+        for i in reversed(range(num)):
+            X[:, i] = (Y[:, i] - np.einsum('bj,bjk->bk', L[:, i+1:, i],
+                                           X[:, i+1:]))/diag[:, i]
+        return X
+
+    @staticmethod
+    def _cholesky_solve(K, B):
+        """Solves ``K @ X = B`` for a symmetric positive definite ``K``.
+
+        Only the lower triangle of ``K`` is read, and it is overwritten by
+        the Cholesky factor. The stiffness matrix of a stable structure is
+        positive definite, so a failed factorization means the structure is
+        a mechanism.
+
+        Args:
+            K (ndarray): Symmetric matrix, shape (n, n). Only the lower
+                triangle needs to be filled in.
+            B (ndarray): Right hand sides, shape (n, m).
+
+        Returns:
+            X (ndarray): Solution, shape (n, m).
+
+        Raises:
+            LinAlgError: If *K* is not positive definite.
+        """
+
+        c_and_lower = scipy.linalg.cho_factor(
+            K, lower=True, overwrite_a=True, check_finite=False)
+        return scipy.linalg.cho_solve(c_and_lower, B, check_finite=False)
+
+    @staticmethod
+    def geometry(truss, properties_dict):
+        """Returns the member geometry and properties of a truss.
+
+        The struct, mass and cost solvers all need the cleaned nodes and
+        edges of the truss, the member lengths and the properties of each
+        member. They are computed the first time this is called during an
+        evaluation and stored as the ``_geometry`` attribute of the truss,
+        so later solvers, including custom ones, get the same arrays without
+        recomputing them. They are stored with the nodes, edges and
+        properties of the truss and *properties_dict* they were computed
+        from, and recomputed if any of these has changed since, for example
+        when duplicate members are marked. The Evaluator discards them once
+        the truss has been evaluated.
 
-        # calculate length and direction sines/cosines of members in global coords
-        edge_vec = nodes[con[:, 1], :] - nodes[con[:, 0], :]
-        # length of projection in x-y plane
-        rho = np.sqrt(edge_vec[:, 0]**2+edge_vec[:, 2]**2)
-        L = np.sqrt(rho**2 + edge_vec[:, 1]**2)  # total length
-        sing = rho < eps  # id vectors along z axis, azimuth is not defined, convention set to 0
-        edge_vec[:, 0][sing] = 1  # cos(0) = 1
-        edge_vec[:, 2][sing] = 0  # sin(0) = 0
-        rho[sing] = 1
-        ca = edge_vec[:, 0]/rho  # cosine of azimuthal angle
-        sa = edge_vec[:, 2]/rho  # sine of azimuthal angle
-        rho[sing] = 0
-        cp = rho/L  # cosine of polar elevation angle
-        sp = edge_vec[:, 1]/L  # sine of polar elevation angle
+        Args:
+            truss (Truss object): Truss to be evaluated.
+            properties_dict (dict): Dictionary containing beam properties.
+
+        Returns:
+            geometry (dict): Dictionary containing:
+
+            - ``'nodes'`` *(ndarray)*: Cleaned node coordinates, shape
+              (num_nodes, 3).
+            - ``'con'`` *(ndarray)*: Cleaned edges, shape (num_con, 2).
+            - ``'matl'`` *(ndarray)*: Cleaned properties, shape (num_con,).
+            - ``'L'`` *(ndarray)*: Member lengths, shape (num_con,).
+            - ``'cosines'`` *(ndarray)*: Direction cosines of each member,
+              from its first node to its second, shape (num_con, 3).
+            - ``'props'`` *(dict)*: Each entry of *properties_dict* for each
+              member, shape (num_con,). A
+              :class:`gastop.materials.MaterialTable` if *properties_dict*
+              is one, gathered in a single operation.
+        """
+
+        key = tuple(np.asarray(arr).tobytes() for arr in (
+            truss.user_spec_nodes, truss.rand_nodes, truss.edges,
+            truss.properties))
+        cached = getattr(truss, '_geometry', None)
+        if cached is not None and cached[0] is properties_dict \
+                and cached[1] == key:
+            return cached[2]
+        geometry = Evaluator._member_geometry(
+            *truss.cleaned_params(), properties_dict)
+        truss._geometry = (properties_dict, key, geometry)
+        return geometry
+
+    @staticmethod
+    def _member_geometry(nodes, con, matl, properties_dict):
+        """Computes member geometry and properties, see :meth:`geometry`.
+
+        Args:
+            nodes (ndarray): Node coordinates, shape (num_nodes, 3).
+            con (ndarray): Edges, shape (num_con, 2).
+            matl (ndarray): Array of member property indices.
+            properties_dict (dict): Dictionary containing beam properties.
+
+        Returns:
+            geometry (dict): Member geometry and properties.
+        """
+
+        edge_vec = nodes[con[:, 1]] - nodes[con[:, 0]]
+        L = np.sqrt(np.sum(edge_vec**2, axis=1))
+        with np.errstate(invalid='ignore', divide='ignore'):
+            cosines = edge_vec/L[:, np.newaxis]
+        if isinstance(properties_dict, MaterialTable):
+            props = properties_dict.take(matl)
+        else:
+            props = {key: val[matl] for key, val in properties_dict.items()}
+        return {'nodes': nodes, 'con': con, 'matl': matl, 'L': L,
+                'cosines': cosines, 'props': props}
+
+    @staticmethod
+    def _element_stiffness(geometry):
+        """Calculates stacked member stiffness blocks and rotation matrices.
+
+        The local stiffness matrix of a member is made of 3x3 blocks,
+        ``[[k1, k2, -k1, k2], [k2.T, k3, -k2.T, k4], [-k1, -k2, k1, -k2],
+        [k2.T, k4, -k2.T, k3]]``, and the local to global transformation is
+        block diagonal with four copies of the 3x3 rotation matrix ``r``.
+        Only the distinct blocks and rotations are computed, for every member
+        at once, stacked along the first axis.
+
+        Args:
+            geometry (dict): Member geometry and properties, as returned by
+                :meth:`geometry`.
+
+        Returns:
+            2-element tuple containing:
+
+            - **k** *(ndarray)*: Local stiffness blocks ``k1, k2, k3, k4``,
+              shape (num_con, 4, 3, 3).
+            - **r** *(ndarray)*: Member rotation matrices, shape (num_con, 3, 3).
+        """
+
+        eps = np.finfo(float).eps  # machine precision
+        L = geometry['L']
+        num_con = L.shape[0]
+
+        # get material properties etc
+        props = geometry['props']
+        E = props['elastic_modulus']
+        G = props['shear_modulus']
+        A = props['x_section_area']
+        Iz = props['moment_inertia_z']
+        Iy = props['moment_inertia_y']
+        J = props['polar_moment_inertia']
+
+        # direction sines/cosines of members in global coords
+        cx, sp, cz = geometry['cosines'].T  # sp is sine of polar elevation angle
+        cp = np.sqrt(cx**2 + cz**2)  # cosine of polar elevation angle
+        # id vectors along y axis, azimuth is not defined, convention set to 0
+        sing = cp*L < eps
+        cp[sing] = 1
+        ca = np.where(sing, 1, cx/cp)  # cosine of azimuthal angle
+        sa = np.where(sing, 0, cz/cp)  # sine of azimuthal angle
+        cp[sing] = 0
 
         # populate transformation matrices
-        r[0, 0, :] = cp*ca
-        r[0, 1, :] = sp
-        r[0, 2, :] = sa*cp
-        r[1, 0, :] = -sp*ca
-        r[1, 1, :] = cp
-        r[1, 2, :] = -sp*sa
-        r[2, 0, :] = -sa
-        r[2, 2, :] = ca
-        T[0:3, 0:3, :] = r
-        T[3:6, 3:6, :] = r
-        T[6:9, 6:9, :] = r
-        T[9:12, 9:12, :] = r
+        r = np.zeros((num_con, 3, 3))  # member rotation matrices
+        r[:, 0, 0] = cp*ca
+        r[:, 0, 1] = sp
+        r[:, 0, 2] = sa*cp
+        r[:, 1, 0] = -sp*ca
+        r[:, 1, 1] = cp
+        r[:, 1, 2] = -sp*sa
+        r[:, 2, 0] = -sa
+        r[:, 2, 2] = ca
 
         # stiffness matrix elements in x,y,z,theta
         co = np.stack((12*np.ones(num_con), 6*L, 4*L**2, 2*L**2), axis=1)
@@ -239,84 +557,833 @@ class Evaluator():
         g = G*J/L  # torsional stiffness about x axis
 
         # form stacked local stiffness matrices
-        k1[0, 0, :] = x
-        k1[1, 1, :] = z[:, 0]
-        k1[2, 2, :] = y[:, 0]
-        k2[1, 2, :] = z[:, 1]
-        k2[2, 1, :] = -y[:, 1]
-        k3[0, 0, :] = g
-        k3[1, 1, :] = y[:, 2]
-        k3[2, 2, :] = z[:, 2]
-        k4[0, 0, :] = -g
-        k4[1, 1, :] = y[:, 3]
-        k4[2, 2, :] = z[:, 3]
-        k2t = np.transpose(k2, axes=(1, 0, 2))
-        kr1 = np.concatenate((k1, k2, -k1, k2), axis=1)
-        kr2 = np.concatenate((k2t, k3, -k2t, k4), axis=1)
-        kr3 = np.concatenate((-k1, -k2, k1, -k2), axis=1)
-        kr4 = np.concatenate((k2t, k4, -k2t, k3), axis=1)
-        Kloc = np.concatenate((kr1, kr2, kr3, kr4), axis=0)
-
-        # construct global stiffness matrix from element matrices
-        for ii in range(num_con):
-            # get member indices to global stiffness matrix
-            e = np.concatenate((np.arange(6*con[ii, 0], 6*con[ii, 0]+6),
-                                np.arange(6*con[ii, 1], 6*con[ii, 1]+6)), axis=0)
-            # transform from local to global coords
-            KlocT[:, :, ii] = np.matmul(Kloc[:, :, ii], T[:, :, ii])
-            # form global stiffness matrix
-            Kglob[np.ix_(e, e)] = (Kglob[np.ix_(e, e)] +
-                                   np.matmul(T[:, :, ii].T, KlocT[:, :, ii]))
-            Ei[ii, :] = e  # save indices for later
-
-            # fix free node displacements
-            # currently acts weird and gives wrong results if a node is fixed in one direction and free in another
-            # calculate displacements
-        for j in range(num_loads):
-            # set unconnected unloaded nodes to fixed
-            unconnected = np.setdiff1d(
-                range(num_nodes), np.concatenate((con.flatten(), np.nonzero(loads[:, :, j].any(axis=1))[0])))
-            fixtures[unconnected, :, j] = 1
-
-            # get indices of free nodes
-            f = np.nonzero(
-                1-np.ravel(fixtures[:, :, j]))
-            f = f[0]  # get array out of tuple
-            # solve for displacements of free nodes
+        k1 = np.zeros((num_con, 3, 3))
+        k2 = np.zeros((num_con, 3, 3))
+        k3 = np.zeros((num_con, 3, 3))
+        k4 = np.zeros((num_con, 3, 3))
+        k1[:, 0, 0] = x
+        k1[:, 1, 1] = z[:, 0]
+        k1[:, 2, 2] = y[:, 0]
+        k2[:, 1, 2] = z[:, 1]
+        k2[:, 2, 1] = -y[:, 1]
+        k3[:, 0, 0] = g
+        k3[:, 1, 1] = y[:, 2]
+        k3[:, 2, 2] = z[:, 2]
+        k4[:, 0, 0] = -g
+        k4[:, 1, 1] = y[:, 3]
+        k4[:, 2, 2] = z[:, 3]
+        k = np.stack((k1, k2, k3, k4), axis=1)
+
+        return k, r
+
+    @staticmethod
+    def _rotate_stiffness(k, r):
+        """Calculates member stiffness matrices in global coords.
+
+        Each 3x3 block of the global matrix is ``r.T @ k_ab @ r``, so only the
+        four distinct blocks are rotated instead of multiplying full 12x12
+        matrices.
+
+        Args:
+            k (ndarray): Local stiffness blocks, shape (num_con, 4, 3, 3), as
+                returned by :meth:`_element_stiffness`.
+            r (ndarray): Member rotation matrices, shape (num_con, 3, 3).
+
+        Returns:
+            Kel (ndarray): Member stiffness matrices in global coords, shape
+            (num_con, 12, 12).
+        """
+
+        rt = np.transpose(r, axes=(0, 2, 1))[:, np.newaxis]
+        R1, R2, R3, R4 = np.moveaxis(
+            np.matmul(np.matmul(rt, k), r[:, np.newaxis]), 1, 0)
+        R2t = np.transpose(R2, axes=(0, 2, 1))
+        return np.block([[R1, R2, -R1, R2],
+                         [R2t, R3, -R2t, R4],
+                         [-R1, -R2, R1, -R2],
+                         [R2t, R4, -R2t, R3]])
+
+    @staticmethod
+    def _member_fos(k, r, U, Ei, props, jit=False):
+        """Calculates factor of safety in each member from node displacements.
+
+        End forces, stresses, and factor of safety are computed for all
+        members under all loading scenarios at once.
+
+        Args:
+            k (ndarray): Local stiffness blocks, shape (num_con, 4, 3, 3), as
+                returned by :meth:`_element_stiffness`.
+            r (ndarray): Member rotation matrices, shape (num_con, 3, 3).
+            U (ndarray): Displacements of all degrees of freedom in global
+                coords, shape (6*num_nodes, num_loads).
+            Ei (ndarray): Global indices of the degrees of freedom of each
+                member, shape (num_con, 12).
+            props (dict): Properties of each member, as in the ``'props'``
+                entry of :meth:`geometry`.
+            jit (bool): Whether to find stresses and factor of safety from the
+                end forces with :func:`gastop.kernels.von_mises_fos`.
+
+        Returns:
+            FoS (ndarray): Factor of safety in each member under each loading
+            scenario, shape (num_con, num_loads).
+        """
+
+        # get material properties etc
+        YS = props['yield_strength'][:, np.newaxis]
+        A = props['x_section_area'][:, np.newaxis]
+        Iz = props['moment_inertia_z'][:, np.newaxis]
+        J = props['polar_moment_inertia'][:, np.newaxis]
+        OD = props['outer_diameter'][:, np.newaxis]
+
+        # displacements of each end in local coords, shape (num_con, 4, 3, num_loads)
+        u = np.matmul(r[:, np.newaxis], U[Ei].reshape(Ei.shape[0], 4, 3, -1))
+        k1, k2, k3, k4 = np.moveaxis(k, 1, 0)
+        # forces and moments at the first end, shape (num_con, 6, num_loads)
+        Q = np.concatenate((
+            np.matmul(k1, u[:, 0] - u[:, 2]) + np.matmul(k2, u[:, 1] + u[:, 3]),
+            np.matmul(np.transpose(k2, axes=(0, 2, 1)), u[:, 0] - u[:, 2]) +
+            np.matmul(k3, u[:, 1]) + np.matmul(k4, u[:, 3])), axis=1)
+        if jit:
+            return kernels.von_mises_fos(Q, YS[:, 0], A[:, 0], Iz[:, 0],
+                                         J[:, 0], OD[:, 0])
+        # combined moment about y, z
+        M = np.sqrt(Q[:, 4]**2 + Q[:, 5]**2)
+        # axial stress due to bending moment
+        sigmaXbending = M*OD/(2*Iz)
+        # axial stress due to axial forces
+        sigmaXaxial = np.abs(Q[:, 0]/A)
+        # transverse stress due to torsion
+        tauTorsion = Q[:, 3]*OD/(2*J)
+        # transverse stress due to shear
+        tauXY = 2*np.sqrt(Q[:, 1]**2 + Q[:, 2]**2)/A
+        # determine von mises stress
+        sigmaVM = np.maximum(np.sqrt((sigmaXbending+sigmaXaxial)**2 + 3*tauTorsion**2),
+                             np.sqrt(sigmaXaxial**2 + 3*tauXY**2))
+        # factor of safety in each beam under each loading condition
+        # fos capped at 1000 to avoid div/0 and huge fos
+        FoS = np.divide(YS, sigmaVM, out=np.full(sigmaVM.shape, 1000.),
+                        where=sigmaVM > YS/1000)
+
+        return FoS
+
+    @staticmethod
+    def mat_struct_analysis_DSM_vectorized(truss, boundary_conditions, properties_dict,
+                                           jit=False):
+        """Calculates deflections and stresses using direct stiffness method.
+
+        Implements :meth:`mat_struct_analysis_DSM`. The member stiffness
+        matrices are computed and rotated to global coords for all members in
+        one batched operation, and scattered into the stiffness matrix of the
+        free degrees of freedom, without forming the full global stiffness
+        matrix. Only the lower triangle of the symmetric stiffness matrix is
+        assembled, and it is solved by Cholesky factorization. A failed
+        factorization means the truss is a mechanism.
+
+        Args:
+            truss (Truss object): Truss to be evaluated. Must have nodes,
+                edges, and properties defined.
+            boundary_conditions (dict): Dictionary containing ``'loads'`` and
+                ``'fixtures'``. See :meth:`mat_struct_analysis_DSM`.
+            properties_dict (dict): Dictionary containing beam properties.
+                See :meth:`mat_struct_analysis_DSM`.
+            jit (bool): Whether to use the compiled kernels in
+                :mod:`gastop.kernels`. Default False.
+
+        Returns:
+            2-element tuple containing:
+
+            - **fos** *(ndarray)*: 2D array of factor of safety values, of
+              shape (num_members, num_loads).
+            - **deflections** *(ndarray)*: 3D array of node deflections, of
+              shape (num_nodes, 6, num_loads).
+        """
+
+        geometry = Evaluator.geometry(truss, properties_dict)
+        nodes, con = geometry['nodes'], geometry['con']
+
+        loads = boundary_conditions['loads'].copy()
+        fixtures = boundary_conditions['fixtures'].copy()
+
+        num_nodes = nodes.shape[0]
+        num_con = con.shape[0]
+        num_loads = loads.shape[2]
+        num_dof = 6*num_nodes
+
+        V = np.zeros((num_nodes, 6, num_loads))  # displacements
+        FoS = np.zeros((num_con, num_loads))  # factor of safety
+
+        # member stiffness matrices in global coords
+        k, r = Evaluator._element_stiffness(geometry)
+        Kel = Evaluator._rotate_stiffness(k, r)
+
+        # local to global matrix indices
+        Ei = (6*con[:, :, np.newaxis] + np.arange(6)).reshape(num_con, 12)
+
+        # solve for displacements, factoring the stiffness matrix only once
+        # for all loading scenarios that share the same fixtures
+        P = loads.reshape(num_dof, num_loads)
+        U = np.zeros((num_dof, num_loads))
+        for f, cases in Evaluator._load_case_groups(num_nodes, con, loads, fixtures):
+            try:
+                U[np.ix_(f, cases)] = Evaluator._cholesky_solve(
+                    Evaluator._reduced_stiffness(Kel, Ei, f, num_dof,
+                                                 lower=True, jit=jit),
+                    P[np.ix_(f, cases)])
+            # if matrix isn't positive definite, stop, FoS still all zeros
+            except np.linalg.LinAlgError:
+                return FoS, V
+        V = U.reshape(num_nodes, 6, num_loads)
+
+        # calculate forces and stresses
+        FoS = Evaluator._member_fos(k, r, U, Ei, geometry['props'],
+                                    jit=jit)
+
+        return FoS, V
+
+    @staticmethod
+    def mat_struct_analysis_DSM_sparse(truss, boundary_conditions, properties_dict):
+        """Calculates deflections and stresses using direct stiffness method.
+
+        Same analysis as :meth:`mat_struct_analysis_DSM`, but the reduced
+        stiffness matrix is assembled as a sparse CSC matrix and the
+        displacements are found with a sparse LU factorization, so memory
+        and time scale with the number of members rather than the square
+        and cube of the number of nodes. Recommended for trusses with
+        more than a few dozen nodes. A pivot of the factorization that is
+        zero, or tiny relative to the diagonal of the stiffness matrix, means
+        the truss is a mechanism.
+
+        Args:
+            truss (Truss object): Truss to be evaluated. Must have nodes,
+                edges, and properties defined.
+            boundary_conditions (dict): Dictionary containing ``'loads'`` and
+                ``'fixtures'``. See :meth:`mat_struct_analysis_DSM`.
+            properties_dict (dict): Dictionary containing beam properties.
+                See :meth:`mat_struct_analysis_DSM`.
+
+        Returns:
+            2-element tuple containing:
+
+            - **fos** *(ndarray)*: 2D array of factor of safety values, of
+              shape (num_members, num_loads).
+            - **deflections** *(ndarray)*: 3D array of node deflections, of
+              shape (num_nodes, 6, num_loads).
+        """
+
+        geometry = Evaluator.geometry(truss, properties_dict)
+        nodes, con = geometry['nodes'], geometry['con']
+
+        loads = boundary_conditions['loads'].copy()
+        fixtures = boundary_conditions['fixtures'].copy()
+
+        num_nodes = nodes.shape[0]
+        num_con = con.shape[0]
+        num_loads = loads.shape[2]
+        num_dof = 6*num_nodes
+
+        V = np.zeros((num_nodes, 6, num_loads))  # displacements
+        FoS = np.zeros((num_con, num_loads))  # factor of safety
+
+        # member stiffness matrices in global coords
+        k, r = Evaluator._element_stiffness(geometry)
+        Kel = Evaluator._rotate_stiffness(k, r)
+
+        # local to global matrix indices
+        Ei = (6*con[:, :, np.newaxis] + np.arange(6)).reshape(num_con, 12)
+
+        # solve for displacements, factoring the stiffness matrix only once
+        # for all loading scenarios that share the same fixtures
+        P = loads.reshape(num_dof, num_loads)
+        U = np.zeros((num_dof, num_loads))
+        for f, cases in Evaluator._load_case_groups(num_nodes, con, loads, fixtures):
+            # sparse matrix of free dofs, duplicates are summed
+            K = Evaluator._reduced_stiffness(
+                Kel, Ei, f, num_dof, sparse=True).tocsc()
+            try:
+                lu = Evaluator._sparse_lu(K)
+            # if matrix is singular, stop, FoS still all zeros
+            except np.linalg.LinAlgError:
+                return FoS, V
+            U[np.ix_(f, cases)] = lu.solve(P[np.ix_(f, cases)])
+        V = U.reshape(num_nodes, 6, num_loads)
+
+        # calculate forces and stresses
+        FoS = Evaluator._member_fos(k, r, U, Ei, geometry['props'])
+
+        return FoS, V
+
+    @staticmethod
+    def _sparse_lu(K):
+        """Factors a sparse matrix by LU factorization.
+
+        ``splu`` only fails for exactly zero pivots, while roundoff leaves
+        tiny nonzero pivots for mechanisms, so pivots that are tiny relative
+        to the diagonal of the matrix are also treated as singular.
+
+        Args:
+            K (sparse matrix): Square matrix, shape (n, n).
+
+        Returns:
+            lu (SuperLU): Factorization of *K*.
+
+        Raises:
+            LinAlgError: If *K* is singular.
+        """
+
+        try:
+            lu = scipy.sparse.linalg.splu(scipy.sparse.csc_matrix(K))
+        except RuntimeError:
+            raise np.linalg.LinAlgError('Matrix is singular')
+        if np.any(np.abs(lu.U.diagonal()) <=
+                  _PIVOT_TOL*np.amax(np.abs(K.diagonal()))):
+            raise np.linalg.LinAlgError('Matrix is singular')
+        return lu
+
+    @staticmethod
+    def mat_struct_analysis_DSM_banded(truss, boundary_conditions, properties_dict):
+        """Calculates deflections and stresses using direct stiffness method.
+
+        Same analysis as :meth:`mat_struct_analysis_DSM`, but the nodes are
+        first renumbered with the reverse Cuthill-McKee ordering of the truss
+        connectivity graph. Randomly numbered nodes give stiffness matrices
+        with nonzeros scattered everywhere, while the renumbered matrices have
+        their nonzeros close to the diagonal, so the displacements can be
+        found with a banded symmetric solver. Deflections are returned in
+        the original node order.
+
+        Args:
+            truss (Truss object): Truss to be evaluated. Must have nodes,
+                edges, and properties defined.
+            boundary_conditions (dict): Dictionary containing ``'loads'`` and
+                ``'fixtures'``. See :meth:`mat_struct_analysis_DSM`.
+            properties_dict (dict): Dictionary containing beam properties.
+                See :meth:`mat_struct_analysis_DSM`.
+
+        Returns:
+            2-element tuple containing:
+
+            - **fos** *(ndarray)*: 2D array of factor of safety values, of
+              shape (num_members, num_loads).
+            - **deflections** *(ndarray)*: 3D array of node deflections, of
+              shape (num_nodes, 6, num_loads).
+        """
+
+        geometry = Evaluator.geometry(truss, properties_dict)
+        nodes, con = geometry['nodes'], geometry['con']
+
+        loads = boundary_conditions['loads']
+        fixtures = boundary_conditions['fixtures']
+
+        num_nodes = nodes.shape[0]
+        num_con = con.shape[0]
+        num_loads = loads.shape[2]
+        num_dof = 6*num_nodes
+
+        V = np.zeros((num_nodes, 6, num_loads))  # displacements
+        FoS = np.zeros((num_con, num_loads))  # factor of safety
+
+        # member stiffness matrices in global coords
+        k, r = Evaluator._element_stiffness(geometry)
+        Kel = Evaluator._rotate_stiffness(k, r)
+
+        # local to global matrix indices
+        Ei = (6*con[:, :, np.newaxis] + np.arange(6)).reshape(num_con, 12)
+
+        # renumber nodes to reduce bandwidth, perm[i] is the old number of
+        # new node i
+        adjacency = scipy.sparse.coo_matrix(
+            (np.ones(num_con), (con[:, 0], con[:, 1])),
+            shape=(num_nodes, num_nodes)).tocsr()
+        perm = scipy.sparse.csgraph.reverse_cuthill_mckee(
+            adjacency, symmetric_mode=False)
+        dof_perm = (6*perm[:, np.newaxis] + np.arange(6)).ravel()
+
+        # solve for displacements, factoring the stiffness matrix only once
+        # for all loading scenarios that share the same fixtures
+        P = loads.reshape(num_dof, num_loads)
+        U = np.zeros((num_dof, num_loads))
+        for f, cases in Evaluator._load_case_groups(num_nodes, con, loads, fixtures):
+            free = np.zeros(num_dof, dtype=bool)
+            free[f] = True
+            f = dof_perm[free[dof_perm]]  # free dofs in renumbered order
+            # sum duplicates
+            K = Evaluator._reduced_stiffness(
+                Kel, Ei, f, num_dof, sparse=True).tocsr().tocoo()
+            upper = K.row <= K.col
+            row, col = K.row[upper], K.col[upper]
+            bandwidth = np.amax(col - row, initial=0)
+            # upper form banded storage, see scipy.linalg.solveh_banded
+            Kband = np.zeros((bandwidth + 1, f.size))
+            Kband[bandwidth + row - col, col] = K.data[upper]
+            try:
+                U[np.ix_(f, cases)] = scipy.linalg.solveh_banded(
+                    Kband, P[np.ix_(f, cases)])
+            # if matrix is singular, stop, FoS still all zeros
+            except np.linalg.LinAlgError:
+                return FoS, V
+        V = U.reshape(num_nodes, 6, num_loads)
+
+        # calculate forces and stresses
+        FoS = Evaluator._member_fos(k, r, U, Ei, geometry['props'])
+
+        return FoS, V
+
+    @staticmethod
+    def mat_struct_analysis_pinned(truss, boundary_conditions, properties_dict,
+                                   jit=False):
+        """Calculates deflections and stresses of a pin jointed truss.
+
+        Members are modeled as axial bars with pinned ends, so each node has
+        only 3 translational degrees of freedom and each member a 6x6
+        stiffness matrix. Moments in the loads and rotational fixtures are
+        ignored. Members only carry axial stress, from which the factor of
+        safety is computed as in :meth:`mat_struct_analysis_DSM`. Rotations in
+        the returned deflections are zero.
+
+        Args:
+            truss (Truss object): Truss to be evaluated. Must have nodes,
+                edges, and properties defined.
+            boundary_conditions (dict): Dictionary containing ``'loads'`` and
+                ``'fixtures'``. See :meth:`mat_struct_analysis_DSM`.
+            properties_dict (dict): Dictionary containing beam properties.
+                See :meth:`mat_struct_analysis_DSM`.
+            jit (bool): Whether to use the compiled kernels in
+                :mod:`gastop.kernels`. Default False.
+
+        Returns:
+            2-element tuple containing:
+
+            - **fos** *(ndarray)*: 2D array of factor of safety values, of
+              shape (num_members, num_loads).
+            - **deflections** *(ndarray)*: 3D array of node deflections, of
+              shape (num_nodes, 6, num_loads).
+        """
+
+        geometry = Evaluator.geometry(truss, properties_dict)
+        nodes, con = geometry['nodes'], geometry['con']
+
+        # translational dofs only
+        loads = boundary_conditions['loads'][:, :3]
+        fixtures = boundary_conditions['fixtures'][:, :3]
+
+        num_nodes = nodes.shape[0]
+        num_con = con.shape[0]
+        num_loads = loads.shape[2]
+        num_dof = 3*num_nodes
+
+        V = np.zeros((num_nodes, 6, num_loads))  # displacements
+        FoS = np.zeros((num_con, num_loads))  # factor of safety
+
+        # get material properties etc
+        E = geometry['props']['elastic_modulus']
+        A = geometry['props']['x_section_area']
+        YS = geometry['props']['yield_strength'][:, np.newaxis]
+
+        # member lengths and direction cosines
+        L = geometry['L']
+        c = geometry['cosines']
+
+        # member stiffness matrices in global coords, shape (num_con, 6, 6)
+        # stiffness of each end block is EA/L*c*c^T
+        k = (E*A/L)[:, np.newaxis, np.newaxis]*c[:, :, np.newaxis]*c[:, np.newaxis, :]
+        Kel = np.block([[k, -k], [-k, k]])
+
+        # local to global matrix indices
+        Ei = (3*con[:, :, np.newaxis] + np.arange(3)).reshape(num_con, 6)
+
+        # solve for displacements, factoring the stiffness matrix only once
+        # for all loading scenarios that share the same fixtures
+        P = loads.reshape(num_dof, num_loads)
+        U = np.zeros((num_dof, num_loads))
+        for f, cases in Evaluator._load_case_groups(num_nodes, con, loads, fixtures):
             try:
-                np.ravel(V[:, :, j])[f] = np.linalg.solve(
-                    Kglob[np.ix_(f, f)], np.ravel(loads[:, :, j])[f])
+                U[np.ix_(f, cases)] = Evaluator._cholesky_solve(
+                    Evaluator._reduced_stiffness(Kel, Ei, f, num_dof,
+                                                 lower=True, jit=jit),
+                    P[np.ix_(f, cases)])
+            # if matrix isn't positive definite, stop, FoS still all zeros
+            except np.linalg.LinAlgError:
+                return FoS, V
+        U = U.reshape(num_nodes, 3, num_loads)
+        V[:, :3] = U
+
+        # axial stress from member elongation
+        elongation = np.einsum('ni,nil->nl', c, U[con[:, 1]] - U[con[:, 0]])
+        sigma = (E/L)[:, np.newaxis]*np.abs(elongation)
+        # fos capped at 1000 to avoid div/0 and huge fos
+        FoS = np.divide(YS, sigma, out=np.full(sigma.shape, 1000.),
+                        where=sigma > YS/1000)
+
+        return FoS, V
+
+    @staticmethod
+    def mat_struct_analysis_PCG(truss, boundary_conditions, properties_dict,
+                                tol=1e-8, maxiter=None):
+        """Calculates deflections and stresses using an iterative solver.
+
+        Same analysis as :meth:`mat_struct_analysis_DSM_sparse`, but the
+        displacements are found with the Jacobi preconditioned conjugate
+        gradient method, which avoids factoring the stiffness matrix of large
+        trusses. If the truss has a ``_parent_deflection`` attribute, which
+        :meth:`gastop.GenAlg.update_population` sets for children of
+        crossover and mutation, it is used as the initial guess. Loading
+        scenarios that don't converge within *maxiter* iterations are solved
+        directly, as in :meth:`mat_struct_analysis_DSM_sparse`, so
+        unconverged deflections are never returned and mechanisms are found
+        even if the iterations don't break down. Iterations can still
+        converge for a mechanism whose loads don't excite it, such as one
+        with an unloaded floating component, which :meth:`screen` finds.
+
+        The number of iterations for each loading scenario is stored as the
+        ``_solver_iterations`` attribute of the truss.
+
+        Args:
+            truss (Truss object): Truss to be evaluated. Must have nodes,
+                edges, and properties defined.
+            boundary_conditions (dict): Dictionary containing ``'loads'`` and
+                ``'fixtures'``. See :meth:`mat_struct_analysis_DSM`.
+            properties_dict (dict): Dictionary containing beam properties.
+                See :meth:`mat_struct_analysis_DSM`.
+            tol (float): Relative tolerance on the norm of the residual.
+            maxiter (int): Maximum number of iterations. If None, defaults to
+                the number of free degrees of freedom.
+
+        Returns:
+            2-element tuple containing:
+
+            - **fos** *(ndarray)*: 2D array of factor of safety values, of
+              shape (num_members, num_loads).
+            - **deflections** *(ndarray)*: 3D array of node deflections, of
+              shape (num_nodes, 6, num_loads).
+        """
+
+        geometry = Evaluator.geometry(truss, properties_dict)
+        nodes, con = geometry['nodes'], geometry['con']
+
+        loads = boundary_conditions['loads']
+        fixtures = boundary_conditions['fixtures']
+
+        num_nodes = nodes.shape[0]
+        num_con = con.shape[0]
+        num_loads = loads.shape[2]
+        num_dof = 6*num_nodes
+
+        V = np.zeros((num_nodes, 6, num_loads))  # displacements
+        FoS = np.zeros((num_con, num_loads))  # factor of safety
+        truss._solver_iterations = np.zeros(num_loads, dtype=int)
+
+        # member stiffness matrices in global coords
+        k, r = Evaluator._element_stiffness(geometry)
+        Kel = Evaluator._rotate_stiffness(k, r)
+
+        # local to global matrix indices
+        Ei = (6*con[:, :, np.newaxis] + np.arange(6)).reshape(num_con, 12)
+
+        # start from the parent's deflections if there are any
+        U0 = getattr(truss, '_parent_deflection', None)
+        if U0 is None or U0.shape != V.shape:
+            U0 = V
+        U0 = U0.reshape(num_dof, num_loads)
+
+        P = loads.reshape(num_dof, num_loads)
+        U = np.zeros((num_dof, num_loads))
+        for f, cases in Evaluator._load_case_groups(num_nodes, con, loads, fixtures):
+            # sparse matrix of free dofs, duplicates are summed
+            K = Evaluator._reduced_stiffness(
+                Kel, Ei, f, num_dof, sparse=True).tocsr()
+            try:
+                x, iterations, converged = Evaluator._pcg(
+                    K, P[np.ix_(f, cases)], U0[np.ix_(f, cases)], tol,
+                    f.size if maxiter is None else maxiter)
+                truss._solver_iterations[cases] = iterations
+                # unconverged scenarios are solved directly, which also
+                # finds mechanisms that didn't stop the iterations
+                if not np.all(converged):
+                    x[:, ~converged] = Evaluator._sparse_lu(K).solve(
+                        P[np.ix_(f, cases[~converged])])
             # if matrix is singular, stop, FoS still all zeros
             except np.linalg.LinAlgError:
                 return FoS, V
-            # calculate forces and stresses
-            for i in range(num_con):
-                # end forces
-                Q[i, :] = np.matmul(
-                    KlocT[:, :, i], np.ravel(V[:, :, j])[Ei[i, :].astype(int)])
-                # combined moment about y, z
-                M = np.sqrt(Q[i, 4]**2 + Q[i, 5]**2)
-                # axial stress due to bending moment
-                sigmaXbending = M*OD[i]/(2*Iz[i])
-                # axial stress due to axial forces
-                sigmaXaxial = np.abs(Q[i, 0]/A[i])
-                # transverse stress due to torsion
-                tauTorsion = Q[i, 3]*OD[i]/(2*J[i])
-                # transverse stress due to shear
-                tauXY = 2*np.sqrt(Q[i, 1]**2 + Q[i, 2]**2)/A[i]
-                # determine von mises stress
-                sigmaVM = np.amax((np.sqrt((sigmaXbending+sigmaXaxial)**2 +
-                                           3*tauTorsion**2), np.sqrt(sigmaXaxial**2 + 3*tauXY**2)))
-                # factor of safety in each beam under each loading condition
-                if sigmaVM > YS[i]/1000:  # to avoid div/0 and huge fos
-                    FoS[i, j] = YS[i]/sigmaVM
-                else:
-                    FoS[i, j] = 1000
+            U[np.ix_(f, cases)] = x
+        V = U.reshape(num_nodes, 6, num_loads)
+
+        # calculate forces and stresses
+        FoS = Evaluator._member_fos(k, r, U, Ei, geometry['props'])
+
+        return FoS, V
+
+    @staticmethod
+    def _pcg(K, B, X0, tol, maxiter):
+        """Solves ``K @ X = B`` with the Jacobi preconditioned conjugate gradient method.
+
+        All columns of *B* are iterated on together, columns that have
+        converged are no longer updated.
+
+        Args:
+            K (sparse matrix): Symmetric positive definite matrix, shape (n, n).
+            B (ndarray): Right hand sides, shape (n, m).
+            X0 (ndarray): Initial guess, shape (n, m).
+            tol (float): Relative tolerance on the norm of the residual.
+            maxiter (int): Maximum number of iterations.
+
+        Returns:
+            3-element tuple containing:
+
+            - **X** *(ndarray)*: Solution, shape (n, m).
+            - **iterations** *(ndarray)*: Number of iterations for each column.
+            - **converged** *(ndarray)*: Whether each column converged.
+
+        Raises:
+            LinAlgError: If *K* is not positive definite.
+        """
+
+        diag = K.diagonal()
+        if np.any(diag <= 0):
+            raise np.linalg.LinAlgError('Matrix is not positive definite')
+        Minv = 1/diag[:, np.newaxis]
+
+        X = X0.copy()
+        R = B - K @ X
+        Z = Minv*R
+        D = Z.copy()  # search directions
+        rz = np.sum(R*Z, axis=0)
+        target = tol*np.linalg.norm(B, axis=0)
+        iterations = np.zeros(B.shape[1], dtype=int)
+        converged = np.linalg.norm(R, axis=0) <= target
+        active = ~converged & (iterations < maxiter)
+        while np.any(active):
+            KD = K @ D
+            dKd = np.sum(D*KD, axis=0)
+            if np.any(dKd[active] <= 0):
+                raise np.linalg.LinAlgError('Matrix is not positive definite')
+            alpha = np.where(active, rz, 0)/np.where(active, dKd, 1)
+            X += alpha*D
+            R -= alpha*KD
+            Z = Minv*R
+            rz_new = np.sum(R*Z, axis=0)
+            beta = np.where(active, rz_new, 0)/np.where(active, rz, 1)
+            D = Z + beta*D
+            rz = rz_new
+            iterations += active
+            converged |= np.linalg.norm(R, axis=0) <= target
+            active = ~converged & (iterations < maxiter)
+        return X, iterations, converged
+
+    @staticmethod
+    def mat_struct_analysis_incremental(truss, boundary_conditions, properties_dict,
+                                        jit=False):
+        """Calculates deflections and stresses, reusing the parent's factorization.
+
+        Mutated children usually differ from their parent in only a few
+        members. If the truss has a ``_factor`` attribute, which
+        :meth:`gastop.GenAlg.update_population` copies from the parent to
+        mutation children, the change in stiffness from the factored truss
+        is a sum of a few member stiffness matrices, and the displacements
+        are found from the factored ones with a Sherman-Morrison-Woodbury
+        update. If too many degrees of freedom are affected, or the free
+        degrees of freedom differ, the stiffness matrix is assembled and
+        factored as in :meth:`mat_struct_analysis_DSM_vectorized`.
+
+        The factorization used is stored as the ``_factor`` attribute of the
+        truss, so that its own children can be updated in turn. Updated
+        trusses keep the factorization they were updated from, so later
+        generations are compared against the truss that was factored. Only
+        mutation children keep it in the next generation, so factorizations
+        of trusses that aren't mutated are freed.
+
+        Args:
+            truss (Truss object): Truss to be evaluated. Must have nodes,
+                edges, and properties defined.
+            boundary_conditions (dict): Dictionary containing ``'loads'`` and
+                ``'fixtures'``. See :meth:`mat_struct_analysis_DSM`.
+            properties_dict (dict): Dictionary containing beam properties.
+                See :meth:`mat_struct_analysis_DSM`.
+            jit (bool): Whether to use the compiled kernels in
+                :mod:`gastop.kernels`. Default False.
+
+        Returns:
+            2-element tuple containing:
+
+            - **fos** *(ndarray)*: 2D array of factor of safety values, of
+              shape (num_members, num_loads).
+            - **deflections** *(ndarray)*: 3D array of node deflections, of
+              shape (num_nodes, 6, num_loads).
+        """
+
+        geometry = Evaluator.geometry(truss, properties_dict)
+        nodes, con, matl = geometry['nodes'], geometry['con'], geometry['matl']
+        num_nodes = nodes.shape[0]
+        num_con = con.shape[0]
+        num_dof = 6*num_nodes
+        loads = boundary_conditions['loads']
+        fixtures = boundary_conditions['fixtures']
+        num_loads = loads.shape[2]
+
+        V = np.zeros((num_nodes, 6, num_loads))  # displacements
+        FoS = np.zeros((num_con, num_loads))  # factor of safety
+
+        factor = getattr(truss, '_factor', None)
+
+        k, r = Evaluator._element_stiffness(geometry)
+        Ei = (6*con[:, :, np.newaxis] + np.arange(6)).reshape(num_con, 12)
+        groups = Evaluator._load_case_groups(num_nodes, con, loads, fixtures)
+        P = loads.reshape(num_dof, num_loads)
+
+        try:
+            U = None
+            if factor is not None:
+                U = Evaluator._woodbury_solve(
+                    factor, nodes, con, matl, groups, P, properties_dict)
+            if U is None:
+                Kel = Evaluator._rotate_stiffness(k, r)
+                factor, U = Evaluator._factor_solve(
+                    nodes, con, matl, Kel, Ei, groups, P, jit=jit)
+        # if matrix is singular, stop, FoS still all zeros
+        except np.linalg.LinAlgError:
+            return FoS, V
+        finally:
+            # any factored truss works as a starting point for the children
+            truss._factor = factor
+        V = U.reshape(num_nodes, 6, num_loads)
+
+        # calculate forces and stresses
+        FoS = Evaluator._member_fos(k, r, U, Ei, geometry['props'],
+                                    jit=jit)
 
         return FoS, V
 
     @staticmethod
-    def mass_basic(truss, properties_dict):
+    def _factor_solve(nodes, con, matl, Kel, Ei, groups, P, jit=False):
+        """Factors the reduced stiffness matrices and solves for displacements.
+
+        Args:
+            nodes (ndarray): Cleaned node coordinates, shape (num_nodes, 3).
+            con (ndarray): Cleaned edges, shape (num_con, 2).
+            matl (ndarray): Cleaned properties, shape (num_con,).
+            Kel (ndarray): Member stiffness matrices in global coordinates,
+                shape (num_con, 12, 12).
+            Ei (ndarray): Global degrees of freedom of each member,
+                shape (num_con, 12).
+            groups (list): Load case groups from :meth:`_load_case_groups`.
+            P (ndarray): Loads, shape (num_dof, num_loads).
+            jit (bool): Whether to assemble with the compiled kernel.
+
+        Returns:
+            2-element tuple containing:
+
+            - **factor** *(dict)*: Factored truss, with the ``'nodes'``,
+              ``'con'`` and ``'matl'`` it was made from and a ``'groups'``
+              list of ``(f, cases, c_and_lower)`` for each load case group,
+              with the Cholesky factor of its reduced stiffness matrix.
+            - **U** *(ndarray)*: Displacements, shape (num_dof, num_loads).
+
+        Raises:
+            LinAlgError: If the stiffness matrix of any group is not
+                positive definite.
+        """
+
+        num_dof = P.shape[0]
+        U = np.zeros(P.shape)
+        factor = {'nodes': nodes, 'con': con, 'matl': matl, 'groups': []}
+        for f, cases in groups:
+            c_and_lower = scipy.linalg.cho_factor(
+                Evaluator._reduced_stiffness(Kel, Ei, f, num_dof,
+                                             lower=True, jit=jit),
+                lower=True, overwrite_a=True, check_finite=False)
+            U[np.ix_(f, cases)] = scipy.linalg.cho_solve(
+                c_and_lower, P[np.ix_(f, cases)], check_finite=False)
+            factor['groups'].append((f, cases, c_and_lower))
+        return factor, U
+
+    @staticmethod
+    def _woodbury_solve(factor, nodes, con, matl, groups, P, properties_dict,
+                        max_rank=1/3):
+        """Solves for displacements by updating a factored truss.
+
+        The stiffness matrix of the truss differs from the factored one by
+        ``dK = E @ D @ E.T``, where ``E`` selects the free degrees of freedom
+        of members that were added or removed and ``D`` is the sum of their
+        stiffness matrices. With ``A`` the factored stiffness matrix,
+        ``inv(A + E D E.T) = inv(A) - inv(A) E inv(I + D E.T inv(A) E) D E.T inv(A)``
+        which only needs as many solves with ``A`` as there are affected
+        degrees of freedom.
+
+        Args:
+            factor (dict): Factored truss, from :meth:`_factor_solve`.
+            nodes (ndarray): Cleaned node coordinates, shape (num_nodes, 3).
+            con (ndarray): Cleaned edges, shape (num_con, 2).
+            matl (ndarray): Cleaned properties, shape (num_con,).
+            groups (list): Load case groups from :meth:`_load_case_groups`.
+            P (ndarray): Loads, shape (num_dof, num_loads).
+            properties_dict (dict): Dictionary containing beam properties.
+            max_rank (float): Largest fraction of the free degrees of freedom
+                that may be affected before giving up on the update.
+
+        Returns:
+            U (ndarray): Displacements, shape (num_dof, num_loads), or None
+            if the truss can't be updated from the factored one.
+
+        Raises:
+            LinAlgError: If the stiffness matrix of the truss is singular.
+        """
+
+        if (nodes.shape != factor['nodes'].shape or
+                len(groups) != len(factor['groups'])):
+            return None
+        for (f, cases), (f0, cases0, _) in zip(groups, factor['groups']):
+            if not (np.array_equal(f, f0) and np.array_equal(cases, cases0)):
+                return None
+
+        # members (with their end coordinates) added and removed since factoring
+        def member_rows(nodes, con, matl):
+            return np.hstack((con, matl[:, np.newaxis],
+                              nodes[con].reshape(-1, 6)))
+        rows0 = member_rows(factor['nodes'], factor['con'], factor['matl'])
+        rows = np.concatenate((rows0, member_rows(nodes, con, matl)))
+        members, inverse = np.unique(rows, axis=0, return_inverse=True)
+        inverse = inverse.ravel()
+        count = (np.bincount(inverse[rows0.shape[0]:], minlength=members.shape[0]) -
+                 np.bincount(inverse[:rows0.shape[0]], minlength=members.shape[0]))
+        changed = np.nonzero(count)[0]
+        num_changed = changed.size
+
+        # stiffness change over the affected degrees of freedom
+        con_c = members[changed, :2].astype(int)
+        k, r = Evaluator._element_stiffness(Evaluator._member_geometry(
+            members[changed, 3:].reshape(-1, 3),
+            np.arange(2*num_changed).reshape(num_changed, 2),
+            members[changed, 2].astype(int), properties_dict))
+        Kel = count[changed, np.newaxis, np.newaxis]*Evaluator._rotate_stiffness(k, r)
+        Ei = (6*con_c[:, :, np.newaxis] + np.arange(6)).reshape(num_changed, 12)
+        dofs, local = np.unique(Ei, return_inverse=True)
+        local = local.reshape(num_changed, 12)
+        num_local = dofs.size
+        flat_idx = local[:, :, np.newaxis]*num_local + local[:, np.newaxis, :]
+        dK = np.bincount(flat_idx.ravel(), weights=Kel.ravel(),
+                         minlength=num_local**2).reshape(num_local, num_local)
+
+        U = np.zeros(P.shape)
+        for f, cases, c_and_lower in factor['groups']:
+            x = scipy.linalg.cho_solve(c_and_lower, P[np.ix_(f, cases)],
+                                       check_finite=False)
+            position = np.full(P.shape[0], -1)
+            position[f] = np.arange(f.size)
+            keep = position[dofs] >= 0
+            idx = position[dofs[keep]]
+            if idx.size > max_rank*f.size:
+                return None
+            if idx.size:
+                D = dK[np.ix_(keep, keep)]
+                E = np.zeros((f.size, idx.size))
+                E[idx, np.arange(idx.size)] = 1
+                W = scipy.linalg.cho_solve(c_and_lower, E, check_finite=False)
+                S = np.eye(idx.size) + D @ W[idx]
+                x -= W @ np.linalg.solve(S, D @ x[idx])
+            U[np.ix_(f, cases)] = x
+        return U
+
+    @staticmethod
+    def mass_basic(truss, properties_dict, jit=False):
         """Calculates mass of structure
 
         Considers only members, does not account for additional mass due
@@ -333,22 +1400,23 @@ class Evaluator():
                 - ``'x_section_area'``: Cross sectional area of the beam,
                   in square meters.
                 - ``'dens'``: Density of the material, in kilograms per cubic meter.
+            jit (bool): Whether to use :func:`gastop.kernels.member_mass`.
+                Default False.
 
         Returns:
             mass (float): Mass of the structure in kilograms.
         """
 
-        nodes, con, matl = truss.cleaned_params()
-
-        # calculate member lengths
-
-        L = np.sqrt(
-            np.sum((nodes[con[:, 1], :] - nodes[con[:, 0], :])**2, axis=1))
+        geometry = Evaluator.geometry(truss, properties_dict)
 
         # get material properties
-        # print(properties_dict['x_section_area'])
-        A = properties_dict['x_section_area'][matl]
-        dens = properties_dict['density'][matl]
+        A = geometry['props']['x_section_area']
+        dens = geometry['props']['density']
+
+        # member lengths
+        L = geometry['L']
+        if jit:
+            return kernels.member_mass(L, A, dens)
         mass = np.sum(A*L*dens)
 
         return mass
@@ -376,31 +1444,161 @@ class Evaluator():
             cost (float): Cost of the structure in $.
         """
 
-        nodes, con, matl = truss.cleaned_params()
+        geometry = Evaluator.geometry(truss, properties_dict)
 
-        # calculate member lengths
-        edge_vec = nodes[con[:, 1], :] - nodes[con[:, 0], :]
-        L = np.sqrt(
-            edge_vec[:, 0]**2 +
-            edge_vec[:, 1]**2 +
-            edge_vec[:, 2]**2)
+        # member lengths
+        L = geometry['L']
 
         # get material properties
-        cost_per_len = properties_dict['cost'][matl]
+        cost_per_len = geometry['props']['cost']
 
         mass = np.sum(L*cost_per_len)
 
         return mass
 
     @staticmethod
-    def interference_ray_tracing(truss):
-        """Not implemented yet.
+    def interference_ray_tracing(truss, obstacles=None):
+        """Counts members that cross into user specified keep-out regions.
+
+        Used when a structure must be designed around something, such as a
+        passenger compartment or other design components. Each member is
+        checked as a line segment against a bounding volume hierarchy of the
+        obstacles, for all members at once.
+
+        Args:
+            truss (Truss object): Truss to be evaluated. Must have nodes and
+                edges defined.
+            obstacles (Obstacles object): Keep-out regions, see
+                :class:`gastop.obstacles.Obstacles`. Default None.
+
+        Returns:
+            interference (int): Number of members that intersect or are
+            inside an obstacle, or None if there are no obstacles.
+        """
+
+        if obstacles is None:
+            return None
+        nodes, con, _ = truss.cleaned_params()
+        return int(np.sum(obstacles.intersects(nodes[con[:, 0]],
+                                               nodes[con[:, 1]])))
+
+    @staticmethod
+    def member_crossings(truss, clearance=0.):
+        """Finds pairs of members that cross or pass too close to each other.
+
+        Members are hashed into a uniform grid by the cells their bounding
+        boxes, grown by half of *clearance* on each side, overlap. Only
+        members sharing a cell whose grown boxes also overlap are compared,
+        instead of all pairs. Members sharing a node are not compared.
+        Distances are between member centerlines.
+
+        Args:
+            truss (Truss object): Truss to be checked. Must have nodes and
+                edges defined.
+            clearance (float): Smallest allowed distance between members.
+                Default 0, meaning only members that intersect are counted.
 
-        TODO: method to determine if truss members are crossing into
-        user specified areas. Used when a structure must be designed around
-        something, such as a passenger compartment or other design components.
+        Returns:
+            crossings (dict): Dictionary containing:
+
+            - ``'count'`` *(int)*: Number of member pairs closer than
+              *clearance*, or intersecting if *clearance* is 0.
+            - ``'min_clearance'`` *(float)*: Smallest distance between
+              compared members, i.e. those without a shared node whose grown
+              bounding boxes overlap, inf if there are none.
         """
-        return None
+
+        nodes, con, _ = truss.cleaned_params()
+        num_con = con.shape[0]
+        crossings = {'count': 0, 'min_clearance': np.inf}
+        if num_con < 2:
+            return crossings
+        p0 = nodes[con[:, 0]]
+        p1 = nodes[con[:, 1]]
+        lo = np.minimum(p0, p1) - clearance/2
+        hi = np.maximum(p0, p1) + clearance/2
+
+        # cells as large as a typical member, so each member covers few cells
+        cell_size = max(np.mean(np.max(hi - lo, axis=1)), np.finfo(float).tiny)
+        origin = lo.min(axis=0)
+        cell_lo = np.floor((lo - origin)/cell_size).astype(int)
+        cell_hi = np.floor((hi - origin)/cell_size).astype(int)
+        shape = cell_hi.max(axis=0) + 1
+
+        # every (cell, member) pair
+        extent = cell_hi - cell_lo + 1
+        count = np.prod(extent, axis=1)
+        member = np.repeat(np.arange(num_con), count)
+        offset = np.arange(count.sum()) - np.repeat(np.cumsum(count) - count, count)
+        cells = cell_lo[member] + np.stack((
+            offset // (extent[member, 1]*extent[member, 2]),
+            offset // extent[member, 2] % extent[member, 1],
+            offset % extent[member, 2]), axis=1)
+        key = np.ravel_multi_index(cells.T, shape)
+
+        # members sharing a cell, paired with those after them in the cell
+        order = np.lexsort((member, key))
+        key, member = key[order], member[order]
+        group_start = np.r_[0, np.nonzero(np.diff(key))[0] + 1]
+        group_end = np.r_[group_start[1:], key.size]
+        group_size = group_end - group_start
+        end = np.repeat(group_end, group_size)
+        num_after = end - np.arange(key.size) - 1
+        first = np.repeat(np.arange(key.size), num_after)
+        second = first + 1 + (np.arange(num_after.sum()) -
+                              np.repeat(np.cumsum(num_after) - num_after, num_after))
+        pairs = np.unique(member[first]*num_con + member[second])
+        a, b = np.divmod(pairs, num_con)
+
+        # only members with overlapping boxes and no shared node
+        keep = (np.all((lo[a] <= hi[b]) & (lo[b] <= hi[a]), axis=1) &
+                np.all(con[a, :, np.newaxis] != con[b, np.newaxis, :], axis=(1, 2)))
+        a, b = a[keep], b[keep]
+        if not a.size:
+            return crossings
+        distance = Evaluator._segment_distance(p0[a], p1[a], p0[b], p1[b])
+        if clearance > 0:
+            close = distance < clearance
+        else:
+            length = np.minimum(np.linalg.norm(p1[a] - p0[a], axis=1),
+                                np.linalg.norm(p1[b] - p0[b], axis=1))
+            close = distance <= 1e-9*length
+        crossings['count'] = int(np.sum(close))
+        crossings['min_clearance'] = float(distance.min())
+        return crossings
+
+    @staticmethod
+    def _segment_distance(p0, p1, q0, q1):
+        """Finds the distances between pairs of line segments.
+
+        Args:
+            p0 (ndarray): Start points of the first segments, shape (n, 3).
+            p1 (ndarray): End points of the first segments, shape (n, 3).
+            q0 (ndarray): Start points of the second segments, shape (n, 3).
+            q1 (ndarray): End points of the second segments, shape (n, 3).
+
+        Returns:
+            distance (ndarray): Distance between each pair, shape (n,).
+        """
+
+        d1 = p1 - p0
+        d2 = q1 - q0
+        r = p0 - q0
+        a = np.sum(d1*d1, axis=1)
+        e = np.sum(d2*d2, axis=1)
+        f = np.sum(d2*r, axis=1)
+        b = np.sum(d1*d2, axis=1)
+        c = np.sum(d1*r, axis=1)
+        denom = a*e - b**2
+        with np.errstate(divide='ignore', invalid='ignore'):
+            # closest points of the infinite lines, clamped to the first segment
+            s = np.where(denom > 1e-12*a*e, np.clip((b*f - c*e)/denom, 0, 1), 0)
+            t = (b*s + f)/e
+            # clamp to the second segment and recompute on the first
+            t = np.clip(t, 0, 1)
+            s = np.clip((b*t - c)/a, 0, 1)
+        return np.linalg.norm(p0 + s[:, np.newaxis]*d1 -
+                              q0 - t[:, np.newaxis]*d2, axis=1)
 
     @staticmethod
     def blank_test(truss, *args, **kwargs):
@@ -430,11 +1628,546 @@ class Evaluator():
         """
 
         truss.mark_duplicates()
-
-        truss.fos, truss.deflection = self.struct_solver(
-            truss, self.boundary_conditions, self.properties_dict)
-        truss.mass = self.mass_solver(truss, self.properties_dict)
-        truss.cost = self.cost_solver(truss, self.properties_dict)
-        truss.interference = self.interferences_solver(truss)
+        if self.cache_size and self._cache_get(truss):
+            return truss
+
+        try:
+            if self.prune:
+                self._struct_analysis_pruned(truss)
+            elif not self.screen(truss):
+                truss.fos, truss.deflection = self.struct_solver(
+                    truss, self.boundary_conditions, self.properties_dict,
+                    **self.struct_solver_params)
+            truss.mass = self.mass_solver(truss, self.properties_dict,
+                                          **self.mass_solver_params)
+            truss.cost = self.cost_solver(truss, self.properties_dict)
+            truss.interference = self.interferences_solver(
+                truss, **self.interferences_solver_params)
+            if self.crossing_clearance is not None:
+                truss.crossings = self.member_crossings(
+                    truss, self.crossing_clearance)
+        finally:
+            # geometry shared by the solvers is only valid for this evaluation
+            vars(truss).pop('_geometry', None)
+
+        self.cache_store(truss)
 
         return truss
+
+    def screen(self, truss):
+        """Checks if a truss is certainly a mechanism, before solving it.
+
+        Finds the connected components of the truss with
+        :meth:`_connected_components`, and counts the fixed degrees of
+        freedom in each. The stiffness matrix is certainly singular if, in any loading
+        scenario:
+
+        - A loaded node that isn't fixed has no members.
+        - A component has too few fixed degrees of freedom to stop rigid
+          body motion, 6 for frames and 3 translations for pin jointed
+          trusses.
+        - For pin jointed trusses, a node has fewer members than free
+          translational degrees of freedom.
+
+        Mechanisms are given the all zero factor of safety and deflections
+        that the struct solvers return for singular matrices, without
+        assembling anything. Whether the truss was screened out is stored as
+        its ``_screened`` attribute. Only the ``mat_struct_analysis`` struct
+        solvers are screened. Duplicates should already be marked.
+
+        Args:
+            truss (Truss object): Truss to be checked.
+
+        Returns:
+            (bool): True if the truss is a mechanism and was given zero results.
+        """
+
+        if not self.struct_solver.__name__.startswith('mat_struct_analysis'):
+            return False
+
+        geometry = Evaluator.geometry(truss, self.properties_dict)
+        con = geometry['con']
+        num_nodes = geometry['nodes'].shape[0]
+        num_con = con.shape[0]
+        if self.struct_solver is Evaluator.mat_struct_analysis_pinned:
+            node_dofs = 3
+        else:
+            node_dofs = 6
+        loads = self.boundary_conditions['loads'][:, :node_dofs]
+        fixtures = self.boundary_conditions['fixtures'][:, :node_dofs] == 1
+        num_loads = loads.shape[2]
+
+        degree = np.bincount(con.ravel(), minlength=num_nodes)
+        num_free = node_dofs - np.sum(fixtures, axis=1)  # (num_nodes, num_loads)
+        # loaded nodes without members
+        mechanism = np.any((degree == 0)[:, np.newaxis] & loads.any(axis=1) &
+                           (num_free > 0))
+        # components with members but not enough supports
+        if not mechanism and num_con:
+            num_comp, labels = Evaluator._connected_components(num_nodes, con)
+            num_fixed = np.zeros((num_comp, num_loads))
+            np.add.at(num_fixed, labels, node_dofs - num_free)
+            has_members = np.bincount(labels[con[:, 0]], minlength=num_comp) > 0
+            # each fixed dof removes at most one rigid body mode
+            mechanism = np.any(has_members[:, np.newaxis] &
+                               (num_fixed < node_dofs))
+        # pin jointed nodes that can move perpendicular to all their members
+        if not mechanism and node_dofs == 3:
+            mechanism = np.any((degree > 0)[:, np.newaxis] &
+                               (degree[:, np.newaxis] < num_free))
+
+        truss._screened = bool(mechanism)
+        if mechanism:
+            truss.fos = np.zeros((num_con, num_loads))
+            truss.deflection = np.zeros((num_nodes, 6, num_loads))
+        return truss._screened
+
+    @staticmethod
+    def _connected_components(num_nodes, con):
+        """Labels the connected components of the graph of a truss.
+
+        Uses a union-find over the members, which for the small graphs of
+        typical trusses is much faster than building a sparse matrix for
+        ``scipy.sparse.csgraph``.
+
+        Args:
+            num_nodes (int): Number of nodes, including nodes without members.
+            con (ndarray): Edges, shape (num_con, 2).
+
+        Returns:
+            2-element tuple containing:
+
+            - **num_comp** *(int)*: Number of connected components, counting
+              each node without members as one.
+            - **labels** *(ndarray)*: Component of each node, numbered from 0
+              in order of their first node, shape (num_nodes,).
+        """
+
+        parent = list(range(num_nodes))
+
+        def find(i):
+            while parent[i] != i:
+                parent[i] = parent[parent[i]]  # path halving
+                i = parent[i]
+            return i
+
+        for i, j in con.tolist():
+            i, j = find(i), find(j)
+            if i != j:
+                parent[max(i, j)] = min(i, j)
+        roots = {}
+        labels = [roots.setdefault(find(i), len(roots)) for i in range(num_nodes)]
+        return len(roots), np.array(labels, dtype=int)
+
+    def prune_unloaded(self, truss):
+        """Finds members that can't carry any load.
+
+        Members in connected components without any loaded nodes carry no
+        load. Neither do dead end chains, members whose end node has no other
+        members, loads, or fixtures, which are removed repeatedly until none
+        are left. Duplicates should already be marked.
+
+        Args:
+            truss (Truss object): Truss to be pruned.
+
+        Returns:
+            2-element tuple containing:
+
+            - **kept** *(ndarray)*: Boolean array, True for the cleaned members
+              that may carry load.
+            - **chains** *(list)*: Dead end members in the order they were
+              removed, as a list of ``(members, ends, anchors)`` tuples of
+              arrays of member indices, their free end nodes, and the nodes
+              they were attached to.
+        """
+
+        nodes, con, matl = truss.cleaned_params()
+        num_nodes = nodes.shape[0]
+        num_con = con.shape[0]
+        loaded = self.boundary_conditions['loads'].any(axis=(1, 2))
+        supported = (self.boundary_conditions['fixtures'] == 1).any(axis=(1, 2))
+
+        # components without loads
+        num_comp, labels = Evaluator._connected_components(num_nodes, con)
+        loaded_comp = np.zeros(num_comp, dtype=bool)
+        loaded_comp[labels[loaded]] = True
+        kept = loaded_comp[labels[con[:, 0]]]
+
+        # peel dead end chains one member at a time from their free ends
+        chains = []
+        while True:
+            degree = np.bincount(con[kept].ravel(), minlength=num_nodes)
+            end = (degree == 1) & ~loaded & ~supported
+            members = np.nonzero(kept & (end[con[:, 0]] | end[con[:, 1]]))[0]
+            if not members.size:
+                break
+            kept[members] = False
+            end_first = end[con[members, 0]]
+            ends = np.where(end_first, con[members, 0], con[members, 1])
+            anchors = np.where(end_first, con[members, 1], con[members, 0])
+            chains.append((members, ends, anchors))
+
+        return kept, chains
+
+    def _struct_analysis_pruned(self, truss):
+        """Runs the struct solver on the members that may carry load.
+
+        Members found by :meth:`prune_unloaded` are removed before solving,
+        and results are scattered back to the full size arrays. Removed
+        members have no stress, so their factor of safety is the maximum of
+        1000. Nodes in unloaded components don't move, and the free ends of
+        dead end chains move rigidly with the node they are attached to.
+
+        Args:
+            truss (Truss object): Truss to be evaluated. Duplicates should
+                already be marked.
+
+        Returns:
+            None
+        """
+
+        nodes, con, matl = truss.cleaned_params()
+        kept, chains = self.prune_unloaded(truss)
+        reduced = Truss(nodes, np.empty((0, 3)), con[kept], matl[kept])
+        # private attributes such as warm starts are passed through
+        private = {key: val for key, val in truss.__dict__.items()
+                   if key.startswith('_') and key != '_geometry'}
+        reduced.__dict__.update(private)
+
+        singular = self.screen(reduced)
+        if not singular:
+            reduced.fos, reduced.deflection = self.struct_solver(
+                reduced, self.boundary_conditions, self.properties_dict,
+                **self.struct_solver_params)
+            singular = np.any(kept) and not np.any(reduced.fos)
+        truss.__dict__.update({key: val for key, val in reduced.__dict__.items()
+                               if key.startswith('_') and key != '_geometry'})
+
+        num_loads = reduced.deflection.shape[2]
+        if singular:
+            # all zeros as usual, including when a loaded node has no members
+            truss.fos = np.zeros((con.shape[0], num_loads))
+            truss.deflection = reduced.deflection
+            return
+        truss.fos = np.full((con.shape[0], num_loads), 1000.)
+        truss.fos[kept] = reduced.fos
+        truss.deflection = reduced.deflection
+        for members, ends, anchors in reversed(chains):
+            anchor_defl = truss.deflection[anchors]
+            arm = nodes[ends] - nodes[anchors]
+            truss.deflection[ends, :3] = (anchor_defl[:, :3] +
+                                          np.cross(anchor_defl[:, 3:], arm[:, :, np.newaxis], axis=1))
+            truss.deflection[ends, 3:] = anchor_defl[:, 3:]
+
+    def __getstate__(self):
+        """Excludes the evaluation cache when pickling.
+
+        Copies sent to worker processes do not cache anything themselves,
+        results are cached by the parent process with :meth:`cache_store`.
+        """
+        state = self.__dict__.copy()
+        state['cache_size'] = 0
+        state['_cache'] = collections.OrderedDict()
+        state['_cache_bytes'] = 0
+        return state
+
+    @staticmethod
+    def genome_key(truss):
+        """Computes a hash key identifying a truss for caching.
+
+        The key depends only on the cleaned nodes, edges and properties of
+        the truss, with edges in sorted order, so trusses that only differ in
+        removed edges or in the order of their edges have the same key.
+        Duplicates should already be marked with
+        :meth:`gastop.truss.Truss.mark_duplicates`.
+
+        Args:
+            truss (Truss object): Truss to compute the key of.
+
+        Returns:
+            2-element tuple containing:
+
+            - **key** *(str)*: Hash of the cleaned truss.
+            - **order** *(ndarray)*: Indices that sort the cleaned edges.
+        """
+
+        nodes, con, matl = truss.cleaned_params()
+        order = np.lexsort((matl, con[:, 1], con[:, 0]))
+        h = hashlib.sha1(np.array(nodes.shape + con.shape).tobytes())
+        h.update(np.ascontiguousarray(nodes, dtype=float).tobytes())
+        h.update(np.ascontiguousarray(con[order], dtype=np.int64).tobytes())
+        h.update(np.ascontiguousarray(matl[order], dtype=np.int64).tobytes())
+        return h.hexdigest(), order
+
+    def cache_lookup(self, truss):
+        """Assigns cached evaluation results to a truss, if there are any.
+
+        Marks duplicate edges of the truss before looking it up. Counts
+        towards *cache_hits* and *cache_misses*. Always returns False if
+        caching is disabled.
+
+        Args:
+            truss (Truss object): Truss to look up.
+
+        Returns:
+            (bool): True if results were found and assigned to the truss.
+        """
+
+        if not self.cache_size:
+            return False
+        truss.mark_duplicates()
+        return self._cache_get(truss)
+
+    def _cache_get(self, truss):
+        """Looks up a truss whose duplicates are already marked.
+
+        Args:
+            truss (Truss object): Truss to look up.
+
+        Returns:
+            (bool): True if results were found and assigned to the truss.
+        """
+
+        key, order = self.genome_key(truss)
+        if key not in self._cache:
+            self.cache_misses += 1
+            return False
+        self.cache_hits += 1
+        truss._screened = False  # nothing was evaluated
+        self._cache.move_to_end(key)
+        fos, deflection, mass, cost, interference, crossings, _ = self._cache[key]
+        if fos is not None:
+            # cached fos is in sorted edge order
+            fos_sorted = fos
+            fos = np.empty_like(fos_sorted)
+            fos[order] = fos_sorted
+        if deflection is not None:
+            deflection = deflection.copy()
+        truss.fos = fos
+        truss.deflection = deflection
+        truss.mass = mass
+        truss.cost = cost
+        truss.interference = interference
+        truss.crossings = crossings
+        return True
+
+    def cache_store(self, truss):
+        """Stores the evaluation results of a truss in the cache.
+
+        If the cache is over its memory limit, least recently used results
+        are discarded. Does nothing if caching is disabled.
+
+        Args:
+            truss (Truss object): Evaluated truss to store. Duplicates
+                should already be marked.
+
+        Returns:
+            None
+        """
+
+        if not self.cache_size:
+            return
+        key, order = self.genome_key(truss)
+        if key in self._cache:
+            self._cache.move_to_end(key)
+            return
+        fos = truss.fos
+        if fos is not None:
+            fos = np.asarray(fos)[order]
+        nbytes = (getattr(fos, 'nbytes', 0) +
+                  getattr(truss.deflection, 'nbytes', 0) + 256)
+        self._cache[key] = (fos, truss.deflection, truss.mass, truss.cost,
+                            truss.interference, truss.crossings, nbytes)
+        self._cache_bytes += nbytes
+        while self._cache_bytes > self.cache_size*2**20 and self._cache:
+            *_, old_nbytes = self._cache.popitem(last=False)[1]
+            self._cache_bytes -= old_nbytes
+
+    def evaluate_batch(self, population, batch_size=None):
+        """Computes mass, deflections, etc for a whole population at once.
+
+        Equivalent to calling the Evaluator on each truss in turn, but the
+        structural analysis of many trusses is done with stacked arrays:
+        member stiffness matrices of all trusses in a batch are computed
+        together, assembled into a stack of global stiffness matrices, and
+        solved with a single batched Cholesky factorization. This avoids
+        most of the per-truss overhead when evaluating large populations of
+        small trusses.
+
+        Only used if the struct solver is one of the direct stiffness method
+        solvers and unloaded members aren't pruned, otherwise each truss is
+        evaluated individually.
+
+        Args:
+            population (list): List of Truss objects to be evaluated.
+            batch_size (int): Number of trusses to solve in each stacked call.
+                If None, chosen so that the stack of stiffness matrices takes
+                up no more than about 64 MB.
+
+        Returns:
+            population (list): The evaluated population.
+        """
+
+        if self.prune or not self.struct_solver.__name__.startswith('mat_struct_analysis_DSM'):
+            for truss in population:
+                self(truss)
+            return population
+
+        # only solve trusses not already in the evaluation cache, or that
+        # are certainly mechanisms
+        trusses = []
+        for truss in population:
+            truss.mark_duplicates()
+            if self.cache_size and self._cache_get(truss):
+                continue
+            if self.screen(truss):
+                truss.mass = self.mass_solver(truss, self.properties_dict,
+                                              **self.mass_solver_params)
+                truss.cost = self.cost_solver(truss, self.properties_dict)
+                truss.interference = self.interferences_solver(
+                    truss, **self.interferences_solver_params)
+                if self.crossing_clearance is not None:
+                    truss.crossings = self.member_crossings(
+                        truss, self.crossing_clearance)
+                vars(truss).pop('_geometry', None)
+                self.cache_store(truss)
+            else:
+                trusses.append(truss)
+
+        num_dof = 6*self.boundary_conditions['loads'].shape[0]
+        if batch_size is None:
+            batch_size = max(int(2**23 // num_dof**2), 1)
+
+        for i in range(0, len(trusses), batch_size):
+            self._evaluate_stack(trusses[i:i+batch_size])
+
+        for truss in trusses:
+            self.cache_store(truss)
+
+        return population
+
+    def _evaluate_stack(self, trusses):
+        """Evaluates a batch of trusses using stacked direct stiffness method.
+
+        Members of all trusses are gathered into one flat list, with node
+        numbers offset so that each truss has its own block of degrees of
+        freedom. Fixed degrees of freedom are eliminated by replacing their
+        rows and columns with those of the identity, so that every truss in
+        the stack has a system of the same size.
+
+        Args:
+            trusses (list): List of Truss objects to be evaluated. Duplicates
+                should already be marked.
+
+        Returns:
+            None
+        """
+
+        loads = self.boundary_conditions['loads']
+        fixtures = self.boundary_conditions['fixtures']
+        properties_dict = self.properties_dict
+
+        num_trusses = len(trusses)
+        num_nodes, _, num_loads = loads.shape
+        num_dof = 6*num_nodes
+
+        # gather members of all trusses, offsetting node numbers
+        nodes, con, matl = [], [], []
+        for b, truss in enumerate(trusses):
+            n, c, m = truss.cleaned_params()
+            nodes.append(n)
+            con.append(c + b*num_nodes)
+            matl.append(m)
+        num_con = np.array([c.shape[0] for c in con])
+        owner = np.repeat(np.arange(num_trusses), num_con)  # truss of each member
+        nodes = np.concatenate(nodes)
+        con = np.concatenate(con)
+        matl = np.concatenate(matl)
+
+        # member stiffness matrices in global coords
+        geometry = Evaluator._member_geometry(nodes, con, matl, properties_dict)
+        k, r = Evaluator._element_stiffness(geometry)
+        Kel = Evaluator._rotate_stiffness(k, r)
+
+        # indices into the stacked degrees of freedom, and into each truss
+        Ei = (6*con[:, :, np.newaxis] + np.arange(6)).reshape(-1, 12)
+        Eloc = Ei - num_dof*owner[:, np.newaxis]
+
+        # construct stack of global stiffness matrices
+        flat_idx = (num_dof**2*owner[:, np.newaxis, np.newaxis] +
+                    Eloc[:, :, np.newaxis]*num_dof + Eloc[:, np.newaxis, :])
+        Kglob = np.bincount(flat_idx.ravel(), weights=Kel.ravel(),
+                            minlength=num_trusses*num_dof**2
+                            ).reshape(num_trusses, num_dof, num_dof)
+
+        connected = np.zeros(num_trusses*num_nodes, dtype=bool)
+        connected[con.ravel()] = True
+        connected = connected.reshape(num_trusses, num_nodes)
+
+        # group loading scenarios with the same fixtures and loaded nodes
+        loaded = loads.any(axis=1)
+        keys = np.concatenate(((fixtures == 1).reshape(num_dof, num_loads),
+                               loaded), axis=0).T
+        patterns, inverse = np.unique(keys, axis=0, return_inverse=True)
+        inverse = inverse.ravel()
+
+        P = loads.reshape(num_dof, num_loads)
+        U = np.zeros((num_trusses, num_dof, num_loads))
+        singular = np.zeros(num_trusses, dtype=bool)
+        for g in range(patterns.shape[0]):
+            cases = np.nonzero(inverse == g)[0]
+            j = cases[0]
+            # set unconnected unloaded nodes to fixed
+            fixed = ((fixtures[:, :, j] == 1)[np.newaxis] |
+                     (~connected & ~loaded[:, j])[:, :, np.newaxis])
+            fixed = fixed.reshape(num_trusses, num_dof)
+            b, d = np.nonzero(fixed)
+            K = Kglob if patterns.shape[0] == 1 else Kglob.copy()
+            K[b, d, :] = 0
+            K[b, :, d] = 0
+            K[b, d, d] = 1
+            Pk = np.where(fixed[:, :, np.newaxis], 0, P[:, cases])
+            # a failed Cholesky factorization means the truss is a mechanism,
+            # as in the per truss solvers. each matrix is only factored once
+            L, failed = Evaluator._cholesky_stack(K)
+            singular |= failed
+            U[:, :, cases] = Evaluator._cholesky_stack_solve(L, Pk)
+        # if matrix is singular, FoS and deflections are all zeros
+        U[singular] = 0
+
+        # calculate forces and stresses
+        FoS = Evaluator._member_fos(k, r, U.reshape(-1, num_loads), Ei,
+                                    geometry['props'], jit=self.jit)
+        FoS[singular[owner]] = 0
+        FoS = np.split(FoS, np.cumsum(num_con)[:-1])
+        V = U.reshape(num_trusses, num_nodes, 6, num_loads)
+
+        # mass and cost
+        L = geometry['L']
+        if self.mass_solver is Evaluator.mass_basic:
+            A = geometry['props']['x_section_area']
+            dens = geometry['props']['density']
+            mass = np.bincount(owner, weights=A*L*dens, minlength=num_trusses)
+        else:
+            mass = [self.mass_solver(truss, properties_dict,
+                                     **self.mass_solver_params)
+                    for truss in trusses]
+        if self.cost_solver is Evaluator.cost_calc:
+            cost_per_len = geometry['props']['cost']
+            cost = np.bincount(owner, weights=L*cost_per_len,
+                               minlength=num_trusses)
+        else:
+            cost = [self.cost_solver(truss, properties_dict)
+                    for truss in trusses]
+
+        for b, truss in enumerate(trusses):
+            truss.fos = FoS[b]
+            truss.deflection = V[b]
+            truss.mass = mass[b]
+            truss.cost = cost[b]
+            truss.interference = self.interferences_solver(
+                truss, **self.interferences_solver_params)
+            if self.crossing_clearance is not None:
+                truss.crossings = self.member_crossings(
+                    truss, self.crossing_clearance)
+            vars(truss).pop('_geometry', None)
@@ -40,7 +40,8 @@ class FitnessFunction():
         self.parameters = parameters  # dictionary
 
     @staticmethod
-    def weighted_sum(truss, goal_fos, critical_nodes, w_fos, w_mass, w_deflection):
+    def weighted_sum(truss, goal_fos, critical_nodes, w_fos, w_mass, w_deflection,
+                     w_interference=0, w_crossing=0):
         """Computes fitness score using a weighted sum of parameters.
 
         Args:
@@ -59,16 +60,24 @@ class FitnessFunction():
                   If scalar, applies the same penalty to all critical nodes.
                   Can also be an array the same size as *critical_nodes* in
                   which case different penalties will be applied to each node.
+            w_interference (float >= 0): Penalty applied to each member
+                  that interferes with an obstacle, as counted in
+                  truss.interference. Default 0.
+            w_crossing (float >= 0): Penalty applied to each pair of members
+                  that cross or are too close, as counted in truss.crossings.
+                  Default 0.
 
         Returns:
             float: Fitness score. Computed as:
             :math:`f = w_{m} m + w_{fos}\max{(\mathrm{fos}_{goal}-\mathrm{fos}_{min}, 0)}
-            + w_{def} ||\mathrm{deflections}||_2`
+            + w_{def} ||\mathrm{deflections}||_2 + w_{int} n_{int} + w_{cr} n_{cr}`
 
             :math:`m` is the mass of the stucture, :math:`\mathrm{fos}_{min}` is the
             lowest fos for the structure under all load conditions.
             If :math:`\mathrm{fos}_{min} > \mathrm{fos}_{goal}`, no fos penalty is applied, so f
-            depends only on mass and deflections.
+            depends only on mass and deflections. :math:`n_{int}` is the
+            number of members interfering with obstacles, and :math:`n_{cr}`
+            the number of crossing member pairs, if known.
 
         """
 
@@ -86,6 +95,10 @@ class FitnessFunction():
             w_deflection*np.sqrt(np.sum(deflections**2, axis=1)))
         fs = np.maximum(goal_fos - minfos, 0)
         f = w_mass*truss.mass + w_fos*fs + deflection_score
+        if w_interference and truss.interference is not None:
+            f += w_interference*truss.interference
+        if w_crossing and truss.crossings is not None:
+            f += w_crossing*truss.crossings['count']
         return f
 
     @staticmethod
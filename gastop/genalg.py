@@ -10,11 +10,101 @@ import numpy as np
 import json
 from tqdm import tqdm
 from multiprocessing import Pool
-import copy
 import colorama
-from gastop import Truss, Mutator, Crossover, Selector, Evaluator, FitnessFunction, encoders, utilities, ProgMon
+from gastop import Truss, Population, Mutator, Crossover, Selector, Evaluator, FitnessFunction, encoders, utilities, ProgMon
 colorama.init()  # for progress bars on ms windows
 
+# objects shared by all tasks in a worker process, set by _init_worker
+_worker = {}
+
+# attributes of a scored truss sent back from workers in a compact record.
+# edges are included as the evaluator marks duplicates in them
+_RECORD_ATTRIBUTES = ('edges', 'fitness_score', 'mass', 'cost', 'interference',
+                      'crossings', '_screened', '_solver_iterations')
+
+
+def _init_worker(evaluator, fitness_function, user_spec_nodes, full_results):
+    """Stores the objects shared by all tasks in a worker process.
+
+    Used as the initializer of the worker pool, so they are only sent to
+    each worker once, rather than with every chunk of tasks.
+    """
+    _worker['evaluator'] = evaluator
+    _worker['fitness_function'] = fitness_function
+    _worker['user_spec_nodes'] = user_spec_nodes
+    _worker['full_results'] = full_results
+
+
+def _critical_deflection(truss, critical_nodes):
+    """Largest deflection of the critical nodes of a truss.
+
+    Args:
+        truss (Truss object): Evaluated truss.
+        critical_nodes (int, array): Node #s to check, as in
+            :meth:`gastop.fitness.FitnessFunction.weighted_sum`. If empty,
+            defaults to all. If None, the deflection isn't computed.
+
+    Returns:
+        float: Largest translation of any critical node under any load
+        case, or NaN if unknown.
+    """
+    if critical_nodes is None or not isinstance(truss.deflection, np.ndarray):
+        return np.nan
+    deflection = truss.deflection
+    if np.size(critical_nodes):
+        deflection = deflection[np.atleast_1d(critical_nodes)]
+    if not deflection.size:
+        return np.nan
+    return np.amax(np.sqrt(np.sum(deflection[:, :3]**2, axis=1)))
+
+
+def _evaluate_and_score(genome):
+    """Builds a truss from its genome, then evaluates and scores it.
+
+    Runs in a worker process. Unless full results were requested when the
+    pool was started, only a compact record of scalar results is sent back,
+    rather than the evaluated truss with its fos and deflection arrays.
+
+    Args:
+        genome (tuple): Random nodes, edges and properties of the truss, and
+            a dict of its private attributes, such as warm start data, or None.
+
+    Returns:
+        Either:
+        truss (Truss object): The evaluated truss, if full results were
+            requested.
+        record (tuple): 3-element tuple containing:
+
+            - **attributes** *(dict)*: Edges with duplicates marked, fitness
+              score, mass, cost, interference, crossings, and solver
+              statistics if any.
+            - **min_fos** *(float)*: Lowest factor of safety, NaN if unknown.
+            - **critical_deflection** *(float)*: Largest deflection of the
+              critical nodes, NaN if unknown.
+    """
+    rand_nodes, edges, properties, private = genome
+    truss = Truss(_worker['user_spec_nodes'], rand_nodes, edges, properties)
+    if private:
+        truss.__dict__.update(private)
+    _worker['evaluator'](truss)
+    _worker['fitness_function'](truss)
+    if _worker['full_results']:
+        # warm start data sent with the genome isn't needed again, and the
+        # factorization is only sent back if children may be updated from it
+        truss.__dict__.pop('_parent_deflection', None)
+        if _worker['evaluator'].struct_solver is not Evaluator.mat_struct_analysis_incremental:
+            truss.__dict__.pop('_factor', None)
+        return truss
+
+    attributes = {name: getattr(truss, name) for name in _RECORD_ATTRIBUTES
+                  if hasattr(truss, name)}
+    if isinstance(truss.fos, np.ndarray) and truss.fos.size:
+        min_fos = np.amin(truss.fos)
+    else:
+        min_fos = np.nan
+    critical_nodes = _worker['fitness_function'].parameters.get('critical_nodes')
+    return attributes, min_fos, _critical_deflection(truss, critical_nodes)
+
 
 class GenAlg():
     """Creates, updates, tracks, loads, and saves populations.
@@ -106,10 +196,39 @@ class GenAlg():
 
         return Truss(user_spec_nodes, new_nodes, new_edges, new_properties)
 
+    def generate_random_batch(self, num_trusses):
+        '''Generates a population of trusses with random properties.
+
+        Equivalent to calling :meth:`generate_random` *num_trusses* times,
+        but the node locations, connections and properties of all of the
+        trusses are each drawn with a single call to numpy.random.
+
+        Args:
+            num_trusses (int): Number of trusses to generate.
+
+        Returns:
+            (Population): Population of the newly generated trusses.
+        '''
+        num_rand_nodes = self.random_params['num_rand_nodes']
+        num_rand_edges = self.random_params['num_rand_edges']
+        user_spec_nodes = self.random_params['user_spec_nodes']
+        num_user_spec_nodes = user_spec_nodes.shape[0]
+        domain = self.random_params['domain']
+
+        new_nodes = np.random.uniform(
+            domain[0], domain[1], (num_trusses, num_rand_nodes, 3))
+        new_edges = np.random.randint(num_rand_nodes + num_user_spec_nodes,
+                                      size=(num_trusses, num_rand_edges, 2))
+        new_properties = np.random.randint(self.random_params['num_material_options'],
+                                           size=(num_trusses, num_rand_edges))
+
+        return Population(user_spec_nodes, new_nodes, new_edges, new_properties)
+
     def initialize_population(self, pop_size=None):
-        '''Initializes population with randomly creates Truss objects.
+        '''Initializes population with randomly created trusses.
 
-        Population is stored in instance of GenAlg object as population attribute.
+        Population is stored in instance of GenAlg object as population
+        attribute, as a :class:`gastop.population.Population`.
 
         Args:
             pop_size (int): size of the population. If not specified, it
@@ -123,9 +242,7 @@ class GenAlg():
         else:
             pop_size = self.ga_params['pop_size']
 
-        self.population = []
-        for i in tqdm(range(pop_size), total=pop_size, leave=False, desc='Initializing Population', position=0):
-            self.population.append(self.generate_random())
+        self.population = self.generate_random_batch(pop_size)
 
     def run(self, num_generations=None, progress_fitness=None, progress_truss=None, num_threads=None):
         '''Runs the genetic algorithm over all populations and generations
@@ -172,40 +289,147 @@ class GenAlg():
         else:
             chunksize = int(np.sqrt(self.ga_params['pop_size']))
 
-        # Loop over all generations, updating progress bar with tqdm:
-        for current_gen in tqdm(range(num_generations), desc='Overall', position=0):
-            self.ga_params['current_generation'] = current_gen
-            # No parallelization
-            if num_threads == 1:
-                for current_truss in tqdm(self.population, desc='Evaluating', position=1):
+        # Workers are started once, with the evaluator and fitness function
+        # preloaded, so each task only sends a genome
+        pool = None
+        if num_threads > 1:
+            pool = Pool(num_threads, initializer=_init_worker,
+                        initargs=(self.evaluator, self.fitness_function,
+                                  self.random_params['user_spec_nodes'],
+                                  self._full_results()))
+        try:
+            # Loop over all generations, updating progress bar with tqdm:
+            for current_gen in tqdm(range(num_generations), desc='Overall', position=0):
+                self.ga_params['current_generation'] = current_gen
+                self._evaluate_population(pool, chunksize)
+
+                # Sort population by fitness score (lowest score = most fit)
+                self.population.sort()
+                if pool is not None and not self._full_results():
+                    self._complete_elite()
+
+                # Update progress monitor plots
+                progress.progress_monitor(current_gen, self.population)
+
+                # Record evaluation statistics
+                gen_stats = progress.pop_progress['Generation '+str(current_gen+1)]
+                if self.evaluator.cache_size:
+                    gen_stats['Cache Hits'] = self.evaluator.cache_hits
+                    gen_stats['Cache Misses'] = self.evaluator.cache_misses
+                    self.evaluator.cache_hits = 0
+                    self.evaluator.cache_misses = 0
+                private = [p for p in self.population.private if p]
+                screened = [p['_screened'] for p in private if '_screened' in p]
+                if screened:
+                    gen_stats['Mechanisms Screened'] = sum(screened)
+                iterations = [p['_solver_iterations'] for p in private
+                              if '_solver_iterations' in p]
+                if iterations:
+                    iterations = np.concatenate(iterations)
+                    gen_stats['Mean Solver Iterations'] = np.mean(iterations)
+                    gen_stats['Max Solver Iterations'] = np.amax(iterations)
+
+                # Create next generation
+                self.update_population()
+
+                # Periodically save config and population to JSON files
+                if self.ga_params['save_frequency'] != 0 and (current_gen % self.ga_params['save_frequency']) == 0:
+                    self.save_state(
+                        dest_config=self.ga_params['config_save_name'], dest_pop=self.ga_params['pop_save_name'])
+        finally:
+            if pool is not None:
+                pool.terminate()
+
+        return self.population[0], progress.pop_progress
+
+    def _full_results(self):
+        '''Whether workers should send back whole evaluated trusses.
+
+        Full results are needed to cache evaluations, and for warm starts of
+        the PCG and incremental solvers from the parent truss.
+        '''
+        return bool(self.ga_params.get('full_results') or self.evaluator.cache_size
+                    or self.evaluator.struct_solver in (
+                        Evaluator.mat_struct_analysis_PCG,
+                        Evaluator.mat_struct_analysis_incremental))
+
+    def _evaluate_population(self, pool=None, chunksize=1):
+        '''Evaluates and scores every truss in the population.
+
+        Args:
+            pool (multiprocessing.Pool): Worker pool started with
+                :func:`_init_worker`. If None, trusses are evaluated in this
+                process.
+            chunksize (int): Number of trusses sent to a worker at a time.
+
+        Returns:
+            None
+        '''
+        population = self.population
+        critical_nodes = self.fitness_function.parameters.get('critical_nodes')
+
+        # No parallelization
+        # (views of the population, so results are stored in place)
+        if pool is None:
+            if self.ga_params.get('batch_evaluation'):
+                self.evaluator.evaluate_batch(list(population))
+            else:
+                for current_truss in tqdm(population, desc='Evaluating', position=1):
                     self.evaluator(current_truss)
-                for current_truss in tqdm(self.population, desc='Scoring', position=1):
-                    self.fitness_function(current_truss)
-            # With multithreading
+            for i, current_truss in enumerate(tqdm(population, desc='Scoring', position=1)):
+                self.fitness_function(current_truss)
+                population.critical_deflection[i] = _critical_deflection(
+                    current_truss, critical_nodes)
+            return
+
+        # With multithreading, evaluating and scoring in a single task.
+        # only send trusses that aren't in the evaluation cache
+        uncached = []
+        for i, truss in enumerate(population):
+            if self.evaluator.cache_lookup(truss):
+                self.fitness_function(truss)
+                population.critical_deflection[i] = _critical_deflection(
+                    truss, critical_nodes)
             else:
-                with Pool(num_threads) as pool:
-                    self.population = list(tqdm(pool.imap(
-                        self.evaluator, self.population, chunksize),
-                        total=self.ga_params['pop_size'], desc='Evaluating', position=1))
-                    self.population = list(tqdm(pool.imap(
-                        self.fitness_function, self.population, chunksize),
-                        total=self.ga_params['pop_size'], desc='Scoring', position=1))
-
-            # Sort population by fitness score (lowest score = most fit)
-            self.population.sort(key=lambda x: x.fitness_score)
+                uncached.append(i)
+        genomes = ((population.rand_nodes[i], population.edges[i],
+                    population.properties[i], population.private[i])
+                   for i in uncached)
+        results = tqdm(pool.imap(_evaluate_and_score, genomes, chunksize),
+                       total=len(uncached), desc='Evaluating', position=1)
+        for i, result in zip(uncached, results):
+            if isinstance(result, Truss):
+                self.evaluator.cache_store(result)
+                population[i] = result
+                population.critical_deflection[i] = _critical_deflection(
+                    result, critical_nodes)
+            else:
+                attributes, population.min_fos[i], population.critical_deflection[i] = result
+                truss = population[i]
+                for name, value in attributes.items():
+                    setattr(truss, name, value)
 
-            # Update progress monitor plots
-            progress.progress_monitor(current_gen, self.population)
+    def _complete_elite(self):
+        '''Evaluates the elite trusses again, to get their fos and deflections.
 
-            # Create next generation
-            self.update_population()
+        Compact records sent back by workers don't include the fos and
+        deflection arrays, which the best truss needs to be plotted and
+        printed. The elite trusses, or at least the best one, are evaluated
+        again in this process after sorting, so the best truss reported by
+        the progress monitor and returned by :meth:`run` has full results,
+        and elite trusses keep them in later generations.
 
-            # Periodically save config and population to JSON files
-            if self.ga_params['save_frequency'] != 0 and (current_gen % self.ga_params['save_frequency']) == 0:
-                self.save_state(
-                    dest_config=self.ga_params['config_save_name'], dest_pop=self.ga_params['pop_save_name'])
+        Args:
+            None
 
-        return self.population[0], progress.pop_progress
+        Returns:
+            None
+        '''
+        num_elite = max(self.ga_params['num_elite'], 1)
+        for i in range(min(num_elite, len(self.population))):
+            truss = self.population[i]
+            if truss.fos is None:
+                self.evaluator(truss)
 
     def save_state(self, dest_config='config.json',
                    dest_pop='population.json'):  # Cristian
@@ -224,7 +448,7 @@ class GenAlg():
         self.config['random_params']['rng_seed'] = np.random.get_state()
 
         config = self.config
-        population = copy.deepcopy(self.population)
+        population = self.population
 
         # Save config data
         with open(dest_config, 'w') as f:
@@ -257,7 +481,7 @@ class GenAlg():
         with open(dest_pop, 'r') as f:
             pop_loaded = json.load(f)
         population = json.loads(pop_loaded, object_hook=encoders.numpy_decoder)
-        population = (Truss(**dct) for dct in population)
+        population = Population.from_trusses([Truss(**dct) for dct in population])
 
         ga = GenAlg(config)
         ga.population = population
@@ -270,7 +494,7 @@ class GenAlg():
         First sorts the population by fitness score, from most fit to least fit.
         Creates selector object from population and method. Calls selector to
         get list of parents for crossover and mutation. Performs crossover and
-        mutation.
+        mutation on the stacked arrays of all parents at once.
 
         Args:
             None
@@ -305,43 +529,50 @@ class GenAlg():
         crossover = Crossover(self.crossover_params)
         mutator = Mutator(self.mutator_params)
 
+        # Iterative solvers start from the parent's deflections
+        warm_start = self.evaluator.struct_solver is Evaluator.mat_struct_analysis_PCG
+
         # Select parents as indices in current population
         crossover_parents = selector(num_crossover, population)
         mutation_parents = selector(num_mutation, population)
 
-        # Save most fit trusses as elites
+        # Save most fit trusses as elites. only mutation children are
+        # updated from a factorization, so elites don't keep theirs
         pop_elite = population[:num_elite]
+        for private in pop_elite.private:
+            if private:
+                private.pop('_factor', None)
 
         pbar = tqdm(total=(num_crossover+num_mutation+num_random),
                     desc='Updating', position=1)
-        # Portion of new population formed by crossover
-        pop_crossover = []
-        for i in range(0, num_crossover, 2):
-            parentindex1 = crossover_parents[i]
-            parentindex2 = crossover_parents[i+1]
-            parent1 = population[parentindex1]
-            parent2 = population[parentindex2]
-            child1, child2 = crossover(parent1, parent2)
-            pop_crossover.extend((child1, child2))
-            pbar.update(2)
+        # Portion of new population formed by crossover, all pairs at once
+        pop_crossover = crossover.cross_population(population, crossover_parents)
+        if warm_start:
+            for i, parent in enumerate(crossover_parents):
+                pop_crossover.private[i] = {
+                    '_parent_deflection': population.deflection[parent]}
+        pbar.update(num_crossover)
 
         # Portion of new population formed by mutation
-        pop_mutation = []
-        for i in range(num_mutation):
-            parentindex = mutation_parents[i]
-            parent = population[parentindex]
-            child = mutator(parent)
-            pop_mutation.append(child)
-            pbar.update()
+        pop_mutation = mutator.mutate_population(population, mutation_parents)
+        for i, parent in enumerate(mutation_parents):
+            inherited = {}
+            if population.private[parent] and '_factor' in population.private[parent]:
+                # lets incremental analysis start from the parent's factorization
+                inherited['_factor'] = population.private[parent]['_factor']
+            if warm_start:
+                inherited['_parent_deflection'] = population.deflection[parent]
+            if inherited:
+                pop_mutation.private[i] = inherited
+        pbar.update(num_mutation)
 
         # Create new random trusses with remaining spots in generation
-        pop_random = []
-        for i in range(num_random):
-            pop_random.append(self.generate_random())
-            pbar.update()
+        pop_random = self.generate_random_batch(num_random)
+        pbar.update(num_random)
 
-        # Append separate lists to form new generation
-        population = pop_elite + pop_crossover + pop_mutation + pop_random
+        # Append separate populations to form new generation
+        population = Population.concatenate(
+            (pop_elite, pop_crossover, pop_mutation, pop_random))
         pbar.close()
         # Update population attribute
         self.population = population
@@ -0,0 +1,111 @@
+"""kernels.py
+This file is a part of GASTOp
+Authors: Amlan Sinha, Cristian Lacey, Daniel Shaw, Paul Kaneelil, Rory Conlin, Susan Redmond
+Licensed under GNU GPLv3.
+This module implements compiled kernels used by the Evaluator class.
+
+The kernels are compiled with Numba if it is installed. Without Numba they
+are plain Python loops, which give the same results but are far slower than
+the NumPy versions in the Evaluator, so the Evaluator only uses them when
+``HAS_NUMBA`` is True.
+
+"""
+import numpy as np
+
+try:
+    import numba
+except ImportError:
+    numba = None
+
+HAS_NUMBA = numba is not None
+
+
+def _jit(func):
+    """Compiles a kernel with Numba if it is installed."""
+    if HAS_NUMBA:
+        return numba.njit(cache=True)(func)
+    return func
+
+
+@_jit
+def assemble_stiffness(Kel, Er, n, lower):
+    """Scatters member stiffness matrices into the reduced stiffness matrix.
+
+    Args:
+        Kel (ndarray): Member stiffness matrices in global coordinates,
+            shape (num_con, k, k).
+        Er (ndarray): Rows of the reduced matrix of the degrees of freedom
+            of each member, -1 if fixed, shape (num_con, k).
+        n (int): Number of free degrees of freedom.
+        lower (bool): Whether to only assemble the lower triangle.
+
+    Returns:
+        K (ndarray): Reduced stiffness matrix, shape (n, n).
+    """
+
+    K = np.zeros((n, n))
+    for m in range(Kel.shape[0]):
+        for i in range(Kel.shape[1]):
+            row = Er[m, i]
+            if row < 0:
+                continue
+            for j in range(Kel.shape[2]):
+                col = Er[m, j]
+                if col < 0 or (lower and col > row):
+                    continue
+                K[row, col] += Kel[m, i, j]
+    return K
+
+
+@_jit
+def von_mises_fos(Q, YS, A, Iz, J, OD):
+    """Calculates factor of safety in each member from its end forces.
+
+    Args:
+        Q (ndarray): Forces and moments at the first end of each member in
+            local coords, shape (num_con, 6, num_loads).
+        YS (ndarray): Yield strength of each member, shape (num_con,).
+        A (ndarray): Cross sectional area of each member, shape (num_con,).
+        Iz (ndarray): Area moment of inertia of each member, shape (num_con,).
+        J (ndarray): Polar moment of inertia of each member, shape (num_con,).
+        OD (ndarray): Outer diameter of each member, shape (num_con,).
+
+    Returns:
+        FoS (ndarray): Factor of safety, capped at 1000, shape
+        (num_con, num_loads).
+    """
+
+    FoS = np.empty((Q.shape[0], Q.shape[2]))
+    for m in range(Q.shape[0]):
+        for j in range(Q.shape[2]):
+            M = np.sqrt(Q[m, 4, j]**2 + Q[m, 5, j]**2)
+            sigma_bending = M*OD[m]/(2*Iz[m])
+            sigma_axial = abs(Q[m, 0, j]/A[m])
+            tau_torsion = Q[m, 3, j]*OD[m]/(2*J[m])
+            tau_shear = 2*np.sqrt(Q[m, 1, j]**2 + Q[m, 2, j]**2)/A[m]
+            sigma = max(np.sqrt((sigma_bending + sigma_axial)**2 + 3*tau_torsion**2),
+                        np.sqrt(sigma_axial**2 + 3*tau_shear**2))
+            if sigma > YS[m]/1000:
+                FoS[m, j] = YS[m]/sigma
+            else:
+                FoS[m, j] = 1000.
+    return FoS
+
+
+@_jit
+def member_mass(L, A, dens):
+    """Calculates the total mass of the members of a truss.
+
+    Args:
+        L (ndarray): Length of each member, shape (num_con,).
+        A (ndarray): Cross sectional area of each member, shape (num_con,).
+        dens (ndarray): Density of each member, shape (num_con,).
+
+    Returns:
+        mass (float): Total mass of the members.
+    """
+
+    mass = 0.
+    for m in range(L.shape[0]):
+        mass += A[m]*L[m]*dens[m]
+    return mass
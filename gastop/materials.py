@@ -0,0 +1,58 @@
+"""materials.py
+This file is a part of GASTOp
+Authors: Amlan Sinha, Cristian Lacey, Daniel Shaw, Paul Kaneelil, Rory Conlin, Susan Redmond
+Licensed under GNU GPLv3.
+This module implements the MaterialTable class.
+
+"""
+import numpy as np
+
+
+class MaterialTable(dict):
+    """Beam properties stored as the columns of a single 2D array.
+
+    Behaves like the properties dictionary used throughout GASTOp, with each
+    entry a view of one column of ``data``, so it can be used anywhere a
+    properties dictionary is expected. The properties of a set of members
+    are fetched with a single gather of the rows of ``data`` using
+    :meth:`take`, rather than indexing each entry separately.
+
+    Entries should not be replaced or resized, as they would then no longer
+    be views of ``data``.
+    """
+
+    def __init__(self, data, names):
+        """Creates a MaterialTable object.
+
+        Args:
+            data (ndarray): Property values, shape (num_beams, num_props).
+                Row i holds the properties of beam type i, in the order of
+                *names*.
+            names (list): Name of the property in each column of *data*,
+                e.g. ``'elastic_modulus'``.
+
+        Returns:
+            MaterialTable object.
+        """
+
+        self.data = np.ascontiguousarray(data, dtype=float)
+        self.names = list(names)
+        super().__init__((name, self.data[:, i])
+                         for i, name in enumerate(self.names))
+
+    def take(self, matl):
+        """Gathers the properties of the given beam types.
+
+        Args:
+            matl (ndarray): Beam type of each member, shape (num_con,).
+
+        Returns:
+            MaterialTable: Table of the properties of each member, with one
+            row per member.
+        """
+
+        return MaterialTable(self.data[matl], self.names)
+
+    def __reduce__(self):
+        # rebuild from the array, so entries stay views of it when copied
+        return (MaterialTable, (self.data, self.names))
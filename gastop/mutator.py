@@ -6,7 +6,7 @@ This module implements the Mutator class.
 
 """
 import numpy as np
-from gastop import Truss
+from gastop import Truss, Population
 
 
 class Mutator():
@@ -171,6 +171,118 @@ class Mutator():
 
         return child
 
+    @staticmethod
+    def gaussian_population(arrays, std, boundaries, int_flag):
+        '''Performs a gaussian mutation on stacked parent arrays.
+
+        Population-level variant of :meth:`gaussian`. Every element is
+        mutated independently, and *std* and *boundaries* apply along the
+        last axis, so the parents are mutated together as one array.
+
+        Args:
+            arrays (ndarray): Stacked arrays of the parents being mutated,
+                shape (num_parents, ...).
+            std (float or array-like): Standard deviation for mutation. If
+                array-like, std[i] is used for arrays[..., i].
+            boundaries (array-like): Domain of allowable values. If a value is
+                mutated outside this region, it is looped back around to the
+                other side.
+            int_flag (bool): flag specifying whether output should be ints.
+
+        Returns:
+            new_arrays (ndarray): Stacked arrays of the mutated children.
+        '''
+        return Mutator.gaussian(arrays, std, boundaries, int_flag)
+
+    @staticmethod
+    def pseudo_bit_flip_population(parents, boundaries, proportions, int_flag):
+        '''Performs a pseudo bit flip mutation on stacked parent arrays.
+
+        Population-level variant of :meth:`pseudo_bit_flip`. Every element is
+        replaced independently, and *boundaries* apply along the last axis,
+        so the parents are mutated together as one array.
+
+        Args:
+            parents (ndarray): Stacked arrays of the parents being mutated,
+                shape (num_parents, ...).
+            boundaries (array-like): Domain of allowable values.
+            proportions (float): Probability of replacing each element.
+            int_flag (bool): flag specifying whether output should be ints.
+
+        Returns:
+            children (ndarray): Stacked arrays of the mutated children.
+        '''
+        return Mutator.pseudo_bit_flip(parents, boundaries, proportions, int_flag)
+
+    @staticmethod
+    def shuffle_index_population(parents):
+        '''Performs a shuffle index mutation on stacked parent arrays.
+
+        Population-level variant of :meth:`shuffle_index`. Each element is
+        chosen for shuffling with probability 1/2, and the chosen elements of
+        each parent are randomly permuted among themselves. All parents are
+        shuffled at once by sorting random keys along each row.
+
+        Args:
+            parents (ndarray): Stacked arrays of the parents being mutated,
+                shape (num_parents, ...).
+
+        Returns:
+            children (ndarray): Stacked arrays of the mutated children.
+        '''
+
+        num_parents = np.shape(parents)[0]
+        flat = np.reshape(parents, (num_parents, -1))
+        check = np.random.random(flat.shape) < 0.5
+
+        # positions of the chosen elements of each row, in order and shuffled.
+        # unchosen elements sort after the chosen ones
+        in_order = np.argsort(~check, axis=1, kind='stable')
+        shuffled = np.argsort(np.where(check, np.random.random(flat.shape), 2.),
+                              axis=1)
+        chosen = np.arange(flat.shape[1]) < check.sum(axis=1)[:, np.newaxis]
+        rows = np.broadcast_to(np.arange(num_parents)[:, np.newaxis],
+                               flat.shape)[chosen]
+
+        children = flat.copy()
+        children[rows, in_order[chosen]] = flat[rows, shuffled[chosen]]
+
+        return children.reshape(np.shape(parents))
+
+    def mutate_population(self, population, parents):
+        """Mutates trusses in a population to produce children.
+
+        Equivalent to calling the Mutator object on each parent, but all
+        children are produced at once from the stacked arrays of the
+        population, using the population-level variant of each method, such
+        as :meth:`gaussian_population`, if there is one.
+
+        Args:
+            population (Population): Population to select parents from.
+            parents (ndarray): Indices of parents in *population*, as returned
+                by a Selector.
+
+        Returns:
+            children (Population): Child of each parent, in the same order.
+
+        """
+
+        parents = np.asarray(parents, dtype=int)
+        children = []
+        for name, method, params in (
+                ('rand_nodes', self.node_method, self.params['node_mutator_params']),
+                ('edges', self.edge_method, self.params['edge_mutator_params']),
+                ('properties', self.property_method, self.params['property_mutator_params'])):
+            arrays = getattr(population, name)[parents]
+            pop_method = getattr(self, method.__name__ + '_population', None)
+            if pop_method is not None:
+                children.append(pop_method(arrays, **params))
+            else:
+                children.append(np.array([method(array, **params) for array in arrays]
+                                         ).reshape(arrays.shape))
+
+        return Population(self.params['user_spec_nodes'], *children)
+
     def __call__(self, truss):
         """Calls a mutator object on a truss to change it.
 
@@ -0,0 +1,339 @@
+"""obstacles.py
+This file is a part of GASTOp
+Authors: Amlan Sinha, Cristian Lacey, Daniel Shaw, Paul Kaneelil, Rory Conlin, Susan Redmond
+Licensed under GNU GPLv3.
+This module implements the Obstacles class.
+
+"""
+import numpy as np
+import scipy.sparse
+import scipy.sparse.csgraph
+
+
+class Obstacles():
+    """Implements a set of keep-out regions that truss members must avoid.
+
+    Obstacles can be axis aligned boxes, spheres, and triangle meshes. A
+    bounding volume hierarchy (BVH) over the bounding boxes of all of them
+    is built once, so that checking a truss only tests each member against
+    the few obstacles near it.
+
+    Members are treated as line segments along their centerlines. A member
+    interferes with an obstacle if any part of it is inside the obstacle.
+    """
+
+    def __init__(self, boxes=None, spheres=None, triangles=None,
+                 solid_meshes=True, leaf_size=4, meshes=None):
+        """Creates an Obstacles object.
+
+        Args:
+            boxes (ndarray): Axis aligned boxes, shape (num_boxes, 2, 3).
+                ``boxes[i]`` is ``[[xmin, ymin, zmin], [xmax, ymax, zmax]]``.
+            spheres (ndarray): Spheres, shape (num_spheres, 4). Each row is
+                ``[x, y, z, radius]``.
+            triangles (ndarray): Triangles of meshes, shape
+                (num_triangles, 3, 3). ``triangles[i, j]`` is the j-th
+                vertex of triangle i.
+            solid_meshes (bool): Whether the triangles form closed surfaces,
+                so that members entirely inside a mesh also interfere with
+                it. If False, only members crossing a triangle interfere.
+            leaf_size (int): Largest number of obstacles in a leaf of the
+                BVH.
+            meshes (ndarray): Index of the mesh each triangle belongs to,
+                shape (num_triangles,). Whether a member is inside a solid
+                mesh is decided for each mesh separately, so meshes may
+                overlap or be nested. If None, triangles that share vertices,
+                directly or through other triangles, form a mesh.
+
+        Returns:
+            Obstacles object.
+        """
+
+        self.boxes = np.zeros((0, 2, 3)) if boxes is None else \
+            np.asarray(boxes, dtype=float).reshape(-1, 2, 3)
+        self.spheres = np.zeros((0, 4)) if spheres is None else \
+            np.asarray(spheres, dtype=float).reshape(-1, 4)
+        self.triangles = np.zeros((0, 3, 3)) if triangles is None else \
+            np.asarray(triangles, dtype=float).reshape(-1, 3, 3)
+        self.solid_meshes = solid_meshes
+        if meshes is None:
+            meshes = self._mesh_labels(self.triangles)
+        self.meshes = np.asarray(meshes, dtype=int).reshape(-1)
+
+        # each obstacle is numbered by its kind (0 box, 1 sphere, 2 triangle)
+        # and its index among obstacles of that kind
+        self.kind = np.concatenate((np.zeros(len(self.boxes), dtype=int),
+                                    np.ones(len(self.spheres), dtype=int),
+                                    np.full(len(self.triangles), 2)))
+        self.index = np.concatenate((np.arange(len(self.boxes)),
+                                     np.arange(len(self.spheres)),
+                                     np.arange(len(self.triangles))))
+        radius = self.spheres[:, 3:]
+        lo = np.concatenate((self.boxes[:, 0], self.spheres[:, :3] - radius,
+                             self.triangles.min(axis=1)))
+        hi = np.concatenate((self.boxes[:, 1], self.spheres[:, :3] + radius,
+                             self.triangles.max(axis=1)))
+        self._build(lo, hi, leaf_size)
+
+    @staticmethod
+    def _mesh_labels(triangles):
+        """Labels triangles connected through shared vertices.
+
+        Args:
+            triangles (ndarray): Triangles, shape (num_triangles, 3, 3).
+
+        Returns:
+            meshes (ndarray): Mesh of each triangle, numbered from 0, shape
+            (num_triangles,).
+        """
+
+        num_triangles = triangles.shape[0]
+        if not num_triangles:
+            return np.zeros(0, dtype=int)
+        _, vertex = np.unique(triangles.reshape(-1, 3), axis=0,
+                              return_inverse=True)
+        # graph of triangles and the vertices they use
+        graph = scipy.sparse.coo_matrix(
+            (np.ones(3*num_triangles),
+             (np.repeat(np.arange(num_triangles), 3),
+              num_triangles + vertex.ravel())),
+            shape=(num_triangles + vertex.max() + 1,)*2)
+        _, labels = scipy.sparse.csgraph.connected_components(
+            graph, directed=False)
+        _, meshes = np.unique(labels[:num_triangles], return_inverse=True)
+        return meshes.ravel()
+
+    def _build(self, lo, hi, leaf_size):
+        """Builds the BVH over obstacle bounding boxes.
+
+        Nodes are split at the median centroid along the longest axis of
+        their centroids' bounds. Node bounds are stored in ``node_lo`` and
+        ``node_hi``, children in ``node_child`` (-1 for leaves), and leaves
+        hold the obstacles ``order[node_start:node_end]``.
+
+        Args:
+            lo (ndarray): Lower corners of obstacle bounding boxes.
+            hi (ndarray): Upper corners of obstacle bounding boxes.
+            leaf_size (int): Largest number of obstacles in a leaf.
+
+        Returns:
+            None
+        """
+
+        centroid = (lo + hi)/2
+        order = np.arange(lo.shape[0])
+        node_lo, node_hi, child, start, end = [], [], [], [], []
+        stack = [(0, lo.shape[0], -1, 0)]  # start, end, parent, side
+        while stack:
+            s, e, parent, side = stack.pop()
+            node = len(start)
+            if parent >= 0:
+                child[parent][side] = node
+            idx = order[s:e]
+            node_lo.append(lo[idx].min(axis=0) if e > s else np.full(3, np.inf))
+            node_hi.append(hi[idx].max(axis=0) if e > s else np.full(3, -np.inf))
+            start.append(s)
+            end.append(e)
+            child.append([-1, -1])
+            if e - s > leaf_size:
+                c = centroid[idx]
+                axis = np.argmax(c.max(axis=0) - c.min(axis=0))
+                mid = (e - s)//2
+                order[s:e] = idx[np.argpartition(c[:, axis], mid)]
+                stack.append((s + mid, e, node, 1))
+                stack.append((s, s + mid, node, 0))
+        self.order = order
+        self.node_lo = np.array(node_lo).reshape(-1, 3)
+        self.node_hi = np.array(node_hi).reshape(-1, 3)
+        self.node_child = np.array(child, dtype=int).reshape(-1, 2)
+        self.node_start = np.array(start, dtype=int)
+        self.node_end = np.array(end, dtype=int)
+
+    @staticmethod
+    def _segment_box(p0, p1, lo, hi):
+        """Tests if segments intersect axis aligned boxes, pairwise.
+
+        Args:
+            p0 (ndarray): Segment start points, shape (n, 3).
+            p1 (ndarray): Segment end points, shape (n, 3).
+            lo (ndarray): Lower corners of boxes, shape (n, 3).
+            hi (ndarray): Upper corners of boxes, shape (n, 3).
+
+        Returns:
+            hit (ndarray): Boolean array, shape (n,).
+        """
+
+        d = p1 - p0
+        with np.errstate(divide='ignore', invalid='ignore'):
+            t0 = (lo - p0)/d
+            t1 = (hi - p0)/d
+        # segments parallel to a slab are either always or never inside it
+        parallel = d == 0
+        inside = (p0 >= lo) & (p0 <= hi)
+        t_near = np.where(parallel, np.where(inside, -np.inf, np.inf),
+                          np.minimum(t0, t1)).max(axis=1)
+        t_far = np.where(parallel, np.where(inside, np.inf, -np.inf),
+                         np.maximum(t0, t1)).min(axis=1)
+        return (t_near <= t_far) & (t_far >= 0) & (t_near <= 1)
+
+    @staticmethod
+    def _segment_sphere(p0, p1, spheres):
+        """Tests if segments intersect spheres, pairwise.
+
+        Args:
+            p0 (ndarray): Segment start points, shape (n, 3).
+            p1 (ndarray): Segment end points, shape (n, 3).
+            spheres (ndarray): Spheres, shape (n, 4).
+
+        Returns:
+            hit (ndarray): Boolean array, shape (n,).
+        """
+
+        d = p1 - p0
+        w = spheres[:, :3] - p0
+        dd = np.sum(d*d, axis=1)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            t = np.clip(np.sum(w*d, axis=1)/dd, 0, 1)
+        t[dd == 0] = 0
+        closest = p0 + t[:, np.newaxis]*d
+        return np.sum((closest - spheres[:, :3])**2, axis=1) <= spheres[:, 3]**2
+
+    @staticmethod
+    def _segment_triangle(p0, p1, triangles):
+        """Tests if segments cross triangles, pairwise.
+
+        Uses the Moller-Trumbore ray-triangle intersection.
+
+        Args:
+            p0 (ndarray): Segment start points, shape (n, 3).
+            p1 (ndarray): Segment end points, shape (n, 3).
+            triangles (ndarray): Triangles, shape (n, 3, 3).
+
+        Returns:
+            hit (ndarray): Boolean array, shape (n,).
+        """
+
+        d = p1 - p0
+        e1 = triangles[:, 1] - triangles[:, 0]
+        e2 = triangles[:, 2] - triangles[:, 0]
+        h = np.cross(d, e2)
+        a = np.sum(e1*h, axis=1)
+        parallel = np.abs(a) <= 1e-12*np.sqrt(
+            np.sum(d*d, axis=1)*np.sum(e1*e1, axis=1)*np.sum(e2*e2, axis=1))
+        a[parallel] = 1
+        s = p0 - triangles[:, 0]
+        u = np.sum(s*h, axis=1)/a
+        q = np.cross(s, e1)
+        v = np.sum(d*q, axis=1)/a
+        t = np.sum(e2*q, axis=1)/a
+        return ~parallel & (u >= 0) & (v >= 0) & (u + v <= 1) & (t >= 0) & (t <= 1)
+
+    def candidates(self, p0, p1):
+        """Finds obstacles whose BVH leaves a segment passes through.
+
+        All segments are traversed together, one level of the BVH at a time.
+
+        Args:
+            p0 (ndarray): Segment start points, shape (n, 3).
+            p1 (ndarray): Segment end points, shape (n, 3).
+
+        Returns:
+            2-element tuple containing:
+
+            - **segment** *(ndarray)*: Segment of each candidate pair.
+            - **obstacle** *(ndarray)*: Obstacle of each candidate pair, as
+              an index into ``kind`` and ``index``.
+        """
+
+        segment = np.arange(p0.shape[0])
+        node = np.zeros(p0.shape[0], dtype=int)
+        found_segment, found_obstacle = [], []
+        while segment.size:
+            hit = self._segment_box(p0[segment], p1[segment],
+                                    self.node_lo[node], self.node_hi[node])
+            segment, node = segment[hit], node[hit]
+            leaf = self.node_child[node, 0] < 0
+            # all obstacles in each leaf that was hit
+            count = self.node_end[node[leaf]] - self.node_start[node[leaf]]
+            offset = np.arange(count.sum()) - np.repeat(np.cumsum(count) - count,
+                                                        count)
+            found_segment.append(np.repeat(segment[leaf], count))
+            found_obstacle.append(self.order[np.repeat(
+                self.node_start[node[leaf]], count) + offset])
+            segment = np.repeat(segment[~leaf], 2)
+            node = self.node_child[node[~leaf]].ravel()
+        return (np.concatenate(found_segment).astype(int),
+                np.concatenate(found_obstacle).astype(int))
+
+    def _crossings(self, p0, p1, segment, obstacle):
+        """Tests candidate pairs exactly.
+
+        Args:
+            p0 (ndarray): Segment start points, shape (n, 3).
+            p1 (ndarray): Segment end points, shape (n, 3).
+            segment (ndarray): Segment of each candidate pair.
+            obstacle (ndarray): Obstacle of each candidate pair.
+
+        Returns:
+            hit (ndarray): Boolean array, whether each pair intersects.
+        """
+
+        hit = np.zeros(segment.shape, dtype=bool)
+        kind = self.kind[obstacle]
+        index = self.index[obstacle]
+        for k, obstacles in enumerate((self.boxes, self.spheres, self.triangles)):
+            pairs = kind == k
+            if not np.any(pairs):
+                continue
+            s = segment[pairs]
+            o = obstacles[index[pairs]]
+            if k == 0:
+                hit[pairs] = self._segment_box(p0[s], p1[s], o[:, 0], o[:, 1])
+            elif k == 1:
+                hit[pairs] = self._segment_sphere(p0[s], p1[s], o)
+            else:
+                hit[pairs] = self._segment_triangle(p0[s], p1[s], o)
+        return hit
+
+    def intersects(self, p0, p1):
+        """Finds which segments interfere with any obstacle.
+
+        Args:
+            p0 (ndarray): Segment start points, shape (n, 3).
+            p1 (ndarray): Segment end points, shape (n, 3).
+
+        Returns:
+            hit (ndarray): Boolean array, shape (n,), True if the segment
+            intersects or is inside an obstacle.
+        """
+
+        p0 = np.asarray(p0, dtype=float).reshape(-1, 3)
+        p1 = np.asarray(p1, dtype=float).reshape(-1, 3)
+        hit = np.zeros(p0.shape[0], dtype=bool)
+        if not self.kind.size or not p0.shape[0]:
+            return hit
+        segment, obstacle = self.candidates(p0, p1)
+        hit[segment[self._crossings(p0, p1, segment, obstacle)]] = True
+
+        # segments that don't cross any triangle are inside a closed mesh if
+        # a ray from their start crosses its triangles an odd number of times,
+        # counted for each mesh, so overlapping meshes don't cancel out
+        if self.solid_meshes and self.triangles.size and not np.all(hit):
+            outside = np.nonzero(~hit)[0]
+            start = p0[outside]
+            span = np.max(self.node_hi[0] - self.node_lo[0])
+            # direction chosen to avoid hitting triangle edges exactly
+            direction = np.array([0.5773502691896258, 0.5773781891304563,
+                                  0.5773223490785734])
+            far = start + 2*(span + np.max(np.abs(start - self.node_lo[0])))*direction
+            segment, obstacle = self.candidates(start, far)
+            triangle = self.kind[obstacle] == 2
+            segment, obstacle = segment[triangle], obstacle[triangle]
+            crossed = self._crossings(start, far, segment, obstacle)
+            num_meshes = self.meshes.max() + 1
+            mesh = self.meshes[self.index[obstacle[crossed]]]
+            count = np.bincount(segment[crossed]*num_meshes + mesh,
+                                minlength=outside.size*num_meshes)
+            inside = np.any(count.reshape(-1, num_meshes) % 2 == 1, axis=1)
+            hit[outside[inside]] = True
+        return hit
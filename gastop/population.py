@@ -0,0 +1,326 @@
+"""population.py
+This file is a part of GASTOp
+Authors: Amlan Sinha, Cristian Lacey, Daniel Shaw, Paul Kaneelil, Rory Conlin, Susan Redmond
+Licensed under GNU GPLv3.
+This module implements the Population and TrussView classes.
+
+"""
+import numpy as np
+
+from gastop import Truss
+
+# arguments of Truss, in order
+_FIELDS = ('user_spec_nodes', 'rand_nodes', 'edges', 'properties', 'fos',
+           'deflection', 'mass', 'interference', 'cost', 'num_joints',
+           'fitness_score', 'crossings')
+_GENOME = ('rand_nodes', 'edges', 'properties')
+# results stored as float arrays, NaN if undefined
+_COLUMNS = ('fitness_score', 'mass', 'cost')
+# results stored as lists, as they aren't scalars or may be None
+_OBJECTS = ('fos', 'deflection', 'interference', 'num_joints', 'crossings')
+# summaries of array results, which aren't Truss attributes
+_SUMMARIES = ('min_fos', 'critical_deflection')
+
+
+class Population():
+    """Population of trusses stored as contiguous arrays.
+
+    All trusses in a population share the same user specified nodes, and
+    have the same number of random nodes and edges. Their genomes are stored
+    stacked along the first axis of the *rand_nodes*, *edges* and
+    *properties* arrays, and scalar results such as fitness score, mass and
+    minimum factor of safety are stored as 1D arrays, with NaN where they
+    are undefined. The largest deflection of the critical nodes is stored in
+    *critical_deflection*, if it has been computed, for example by
+    :meth:`gastop.genalg.GenAlg.run`.
+
+    Indexing a population with an integer, or iterating over it, gives
+    :class:`TrussView` objects, which can be used anywhere a Truss is
+    expected and read and write their attributes directly in the population
+    arrays. Indexing with a slice or an array of indices gives a new
+    Population holding copies of the selected trusses.
+    """
+
+    def __init__(self, user_spec_nodes, rand_nodes, edges, properties):
+        """Creates a Population object with undefined results.
+
+        Args:
+            user_spec_nodes (ndarray): User specified nodes shared by all
+                trusses, shape (num_user_spec_nodes, 3).
+            rand_nodes (ndarray): Random nodes of each truss, shape
+                (pop_size, num_rand_nodes, 3).
+            edges (ndarray): Edges of each truss, shape
+                (pop_size, num_rand_edges, 2).
+            properties (ndarray): Beam property indices of each truss, shape
+                (pop_size, num_rand_edges).
+
+        Returns:
+            Population object.
+        """
+
+        self.user_spec_nodes = user_spec_nodes
+        self.rand_nodes = np.ascontiguousarray(rand_nodes)
+        self.edges = np.ascontiguousarray(edges)
+        self.properties = np.ascontiguousarray(properties)
+        pop_size = self.rand_nodes.shape[0]
+        for name in _COLUMNS + _SUMMARIES:
+            setattr(self, name, np.full(pop_size, np.nan))
+        for name in _OBJECTS:
+            setattr(self, name, [None]*pop_size)
+        # private attributes of each truss, such as cached factorizations
+        self.private = [None]*pop_size
+
+    @staticmethod
+    def from_trusses(trusses):
+        """Creates a population from a list of trusses.
+
+        Args:
+            trusses (list): Non-empty list of Truss objects, all with the
+                same number of random nodes and edges.
+
+        Returns:
+            population (Population): Population holding copies of the trusses.
+        """
+
+        population = Population(trusses[0].user_spec_nodes,
+                                np.stack([truss.rand_nodes for truss in trusses]),
+                                np.stack([truss.edges for truss in trusses]),
+                                np.stack([truss.properties for truss in trusses]))
+        for i, truss in enumerate(trusses):
+            population._set_results(i, truss)
+        return population
+
+    @staticmethod
+    def concatenate(populations):
+        """Joins a sequence of populations into a single population.
+
+        Args:
+            populations (list): Population objects to join, in order.
+
+        Returns:
+            population (Population): New population holding copies of the
+            trusses of all of *populations*.
+        """
+
+        population = Population(populations[0].user_spec_nodes,
+                                *(np.concatenate([getattr(pop, name) for pop in populations])
+                                  for name in _GENOME))
+        for name in _COLUMNS + _SUMMARIES:
+            setattr(population, name, np.concatenate(
+                [getattr(pop, name) for pop in populations]))
+        for name in _OBJECTS + ('private',):
+            setattr(population, name, sum(
+                (getattr(pop, name) for pop in populations), []))
+        population.private = [None if p is None else dict(p)
+                              for p in population.private]
+        return population
+
+    def take(self, indices):
+        """Selects trusses from the population.
+
+        Args:
+            indices (array-like): Integer indices of trusses to select.
+
+        Returns:
+            population (Population): New population holding copies of the
+            selected trusses, in the order of *indices*.
+        """
+
+        indices = np.asarray(indices, dtype=int)
+        population = Population(self.user_spec_nodes,
+                                *(getattr(self, name)[indices] for name in _GENOME))
+        for name in _COLUMNS + _SUMMARIES:
+            setattr(population, name, getattr(self, name)[indices])
+        for name in _OBJECTS:
+            column = getattr(self, name)
+            setattr(population, name, [column[i] for i in indices])
+        population.private = [None if self.private[i] is None else dict(self.private[i])
+                              for i in indices]
+        return population
+
+    def sort(self, key=None, reverse=False):
+        """Sorts the population in place, lowest fitness score first.
+
+        NaN fitness scores are sorted last. Views created before sorting
+        refer to positions in the population, so they see whichever truss
+        is moved there.
+
+        Args:
+            key (callable): If given, trusses are sorted by ``key(truss)``
+                instead of by fitness score, as in ``list.sort``.
+            reverse (bool): Whether to sort in descending order.
+
+        Returns:
+            None
+        """
+
+        if key is None:
+            keys = self.fitness_score
+        else:
+            keys = np.array([key(truss) for truss in self])
+        order = np.argsort(-keys if reverse else keys, kind='stable')
+        self.__dict__.update(vars(self.take(order)))
+
+    def to_trusses(self):
+        """Creates a list of Truss objects from the population.
+
+        Returns:
+            trusses (list): Plain Truss objects, holding copies of the arrays
+            of each truss in the population.
+        """
+
+        return [truss.copy() for truss in self]
+
+    def _set_results(self, index, truss):
+        """Copies the results and private attributes of a truss."""
+
+        view = TrussView(self, index)
+        for name in _COLUMNS + _OBJECTS:
+            setattr(view, name, getattr(truss, name))
+        self.critical_deflection[index] = np.nan
+        private = view.__dict__
+        private.clear()
+        private.update((key, val) for key, val in vars(truss).items()
+                       if key.startswith('_'))
+
+    def __len__(self):
+        return self.rand_nodes.shape[0]
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield TrussView(self, i)
+
+    def __getitem__(self, key):
+        if isinstance(key, (int, np.integer)):
+            if not -len(self) <= key < len(self):
+                raise IndexError('population index out of range')
+            return TrussView(self, key % len(self))
+        return self.take(np.arange(len(self))[key])
+
+    def __setitem__(self, index, truss):
+        if not -len(self) <= index < len(self):
+            raise IndexError('population index out of range')
+        index = index % len(self)
+        if isinstance(truss, TrussView) and truss._population is self \
+                and truss._index == index:
+            return
+        for name in _GENOME:
+            getattr(self, name)[index] = getattr(truss, name)
+        self._set_results(index, truss)
+
+
+def _stored(name):
+    """Property reading and writing an attribute stored in the population."""
+
+    def fget(self):
+        return getattr(self._population, name)[self._index]
+
+    def fset(self, value):
+        getattr(self._population, name)[self._index] = value
+
+    return property(fget, fset)
+
+
+def _column(name):
+    """Property for a result stored in a float array, NaN if undefined.
+
+    Values that aren't real numbers, such as those returned by the blank test
+    solvers, are stored with the other attributes of the truss instead.
+    """
+
+    def fget(self):
+        if name in self.__dict__:
+            return self.__dict__[name]
+        value = getattr(self._population, name)[self._index]
+        return None if np.isnan(value) else value
+
+    def fset(self, value):
+        self.__dict__.pop(name, None)
+        if value is None:
+            value = np.nan
+        elif not np.isrealobj(value) or np.ndim(value) != 0:
+            self.__dict__[name] = value
+            value = np.nan
+        getattr(self._population, name)[self._index] = value
+
+    return property(fget, fset)
+
+
+class TrussView(Truss):
+    """A truss stored in a Population.
+
+    Behaves like a Truss, but its nodes, edges, properties and results are
+    read from and written to the arrays of the population, so changes such
+    as marking duplicate edges or assigning a fitness score are kept in the
+    population. Other attributes, such as private warm start data, are
+    stored in ``population.private``.
+
+    Copies and pickles of a view are plain Truss objects, detached from the
+    population, so a view can be sent to a worker process without the rest
+    of the population.
+    """
+
+    __slots__ = ('_population', '_index')
+
+    rand_nodes = _stored('rand_nodes')
+    edges = _stored('edges')
+    properties = _stored('properties')
+    deflection = _stored('deflection')
+    interference = _stored('interference')
+    num_joints = _stored('num_joints')
+    crossings = _stored('crossings')
+    fitness_score = _column('fitness_score')
+    mass = _column('mass')
+    cost = _column('cost')
+
+    def __init__(self, population, index):
+        """Creates a view of a truss in a population.
+
+        Args:
+            population (Population): Population the truss is stored in.
+            index (int): Non-negative index of the truss in the population.
+
+        Returns:
+            TrussView object.
+        """
+
+        object.__setattr__(self, '_population', population)
+        object.__setattr__(self, '_index', index)
+        if population.private[index] is None:
+            population.private[index] = {}
+        object.__setattr__(self, '__dict__', population.private[index])
+
+    @property
+    def user_spec_nodes(self):
+        return self._population.user_spec_nodes
+
+    @property
+    def fos(self):
+        return self._population.fos[self._index]
+
+    @fos.setter
+    def fos(self, value):
+        self._population.fos[self._index] = value
+        self._population.min_fos[self._index] = np.nan if value is None \
+            or np.size(value) == 0 else np.amin(value)
+
+    def copy(self):
+        """Creates a plain Truss holding copies of the arrays of the view.
+
+        Args:
+            None
+
+        Returns:
+            truss (Truss object): Truss detached from the population.
+        """
+
+        cls, args, private = self.__reduce__()
+        truss = cls(*args)
+        truss.__dict__.update(private)
+        return truss
+
+    def __reduce__(self):
+        args = [getattr(self, name) for name in _FIELDS]
+        for i in range(1, 4):
+            args[i] = args[i].copy()
+        return Truss, tuple(args), dict(self.__dict__)
@@ -10,6 +10,8 @@ import matplotlib.pyplot as plt
 import numpy as np
 import collections
 
+from gastop import Population
+
 
 
 class ProgMon():
@@ -111,11 +113,16 @@ class ProgMon():
             Nothing
         """
         try:
-            fitscore = [i.fitness_score for i in population]
+            if isinstance(population, Population):
+                fitscore = population.fitness_score
+                # detached copy, so the stats don't keep the population alive
+                best_truss = population[0].copy()
+            else:
+                fitscore = [i.fitness_score for i in population]
+                best_truss = population[0]
             fitscore_min = fitscore[0]
             fitscore_median = np.median(fitscore)
             fitscore_range = fitscore[-1] - fitscore_min
-            best_truss = population[0]
             pop_stats = [current_gen+1,best_truss,fitscore_min,fitscore_median,fitscore_range]
             dict_headings = ['Generation','Best Truss','Best Fitness Score',
             'Population Median Fitness Score','Population Fitness Score Range']
@@ -26,7 +26,7 @@ class Truss():
     def __init__(self, user_spec_nodes, rand_nodes, edges,
                  properties, fos=None, deflection=None, mass=None,
                  interference=None, cost=None, num_joints=None,
-                 fitness_score=None):
+                 fitness_score=None, crossings=None):
         """Creates a Truss object
 
         Args:
@@ -52,11 +52,14 @@ class Truss():
             deflection (ndarray): Array of node deflections under load,
                 in meters. Default None.
             mass (float): Mass of the structure, in kilograms. Default None.
-            interference (float): Total length of members passing through
+            interference (float): Number of members passing through
                 user specified areas. Default None.
             cost (float): Cost of the structure in dollars. Default None.
             num_joints (int): Number of connections between members. Default None.
             fitness_score (float): Fitness score of the truss. Default None.
+            crossings (dict): Number of member pairs that cross or are too
+                close, and the smallest distance between members, under the
+                keys ``'count'`` and ``'min_clearance'``. Default None.
 
         Returns:
             Truss object.
@@ -72,6 +75,7 @@ class Truss():
         self.cost = cost
         self.num_joints = num_joints
         self.fitness_score = fitness_score
+        self.crossings = crossings
 
     # def sort(self):
     #     """Not implemented yet.
@@ -17,7 +17,7 @@ import shutil
 import copy
 from pathlib import Path
 
-from gastop import Truss, ProgMon, encoders
+from gastop import Truss, ProgMon, MaterialTable, encoders
 
 
 def save_gif(progress_history, progress_fitness, progress_truss, animation_path, num_gens, config, gif_pause=0.5):
@@ -84,37 +84,30 @@ def beam_file_parser(properties_path):
             the directory GASTOp is being executed from.
 
     Returns:
-        properties_dict (dict): Dictionary of property values.
+        properties_dict (MaterialTable): Dictionary of property values.
         Each entry is an ndarray of the keyed property of each beam. For example,
         properties_dict['dens'] is an ndarray of the density of each beam type.
+        The entries are columns of a single array, see
+        :class:`gastop.materials.MaterialTable`.
 
     """
 
-    OD = np.loadtxt(properties_path, delimiter=',', skiprows=1, usecols=2)
-    ID = np.loadtxt(properties_path, delimiter=',', skiprows=1, usecols=3)
-    E = np.loadtxt(properties_path, delimiter=',', skiprows=1, usecols=4)
-    YS = np.loadtxt(properties_path, delimiter=',', skiprows=1, usecols=5)
-    dens = np.loadtxt(properties_path, delimiter=',', skiprows=1, usecols=6)
-    nu = np.loadtxt(properties_path, delimiter=',', skiprows=1, usecols=7)
-    cost = np.loadtxt(properties_path, delimiter=',', skiprows=1, usecols=8)
+    OD, ID, E, YS, dens, nu, cost = np.loadtxt(
+        properties_path, delimiter=',', skiprows=1, usecols=range(2, 9),
+        ndmin=2).T
     G = E/(2*(1+nu))
     A = np.pi/4*(OD**2 - ID**2)
     Iz = np.pi/64*(OD**4 - ID**4)
     Iy = np.pi/64*(OD**4 - ID**4)
     J = np.pi/32*(OD**4 - ID**4)
 
-    properties_dict = {'elastic_modulus': E,
-                       'yield_strength': YS,
-                       'shear_modulus': G,
-                       'poisson_ratio': nu,
-                       'x_section_area': A,
-                       'moment_inertia_z': Iz,
-                       'moment_inertia_y': Iy,
-                       'polar_moment_inertia': J,
-                       'outer_diameter': OD,
-                       'inner_diameter': ID,
-                       'density': dens,
-                       'cost': cost}
+    names = ['elastic_modulus', 'yield_strength', 'shear_modulus',
+             'poisson_ratio', 'x_section_area', 'moment_inertia_z',
+             'moment_inertia_y', 'polar_moment_inertia', 'outer_diameter',
+             'inner_diameter', 'density', 'cost']
+    properties_dict = MaterialTable(
+        np.column_stack((E, YS, G, nu, A, Iz, Iy, J, OD, ID, dens, cost)),
+        names)
 
     return properties_dict
 
@@ -218,6 +211,10 @@ def init_file_parser(init_file_path):  # Cristian
         config['ga_params']['pop_save_name'] = 'population.json'
     if not config['ga_params']['save_frequency']:
         config['ga_params']['save_frequency'] = 0
+    if not config['ga_params'].get('batch_evaluation'):
+        config['ga_params']['batch_evaluation'] = False
+    if not config['ga_params'].get('full_results'):
+        config['ga_params']['full_results'] = False
 
     # evaluator_params
     config['evaluator_params']['boundary_conditions'] = {}
@@ -142,7 +142,7 @@ setup(
     #
     # For an analysis of "install_requires" vs pip's requirements files see:
     # https://packaging.python.org/en/latest/requirements.html
-    install_requires=['numpy', 'matplotlib',
+    install_requires=['numpy', 'scipy', 'matplotlib',
                       'configobj', 'tqdm', 'colorama', 'imageio'],  # Optional
 
     # List additional groups of dependencies here (e.g. development
@@ -156,6 +156,7 @@ setup(
     extras_require={  # Optional
         'dev': ['check-manifest'],
         'test': ['pytest', 'pytest-cov'],
+        'jit': ['numba'],
     },
 
     # If there are data files included in your packages that need to be
@@ -10,7 +10,7 @@ This module implements testing for the crossover class
 import unittest
 import numpy as np
 
-from gastop import Crossover
+from gastop import Crossover, Population
 
 
 class TestCrossover_singlepointsplit(unittest.TestCase):  # Amlan
@@ -124,5 +124,52 @@ class TestCrossover_twopointssplit(unittest.TestCase):  # Amlan
             str((children[1]).dtype), str(check.dtype))
 
 
+class TestCrossover_population(unittest.TestCase):
+    """Tests the population-level crossover methods of the Crossover class."""
+
+    def test_single_point_split(self):
+        """Tests that each child is split from its parents at a single point."""
+        arrays1 = np.zeros((50, 10, 2), dtype=int)
+        arrays2 = np.ones((50, 10, 2), dtype=int)
+
+        children1, children2 = Crossover.single_point_split_population(
+            arrays1, arrays2)
+
+        np.testing.assert_array_equal(children1 + children2, 1)
+        # all zeros up to the split point, then all ones
+        self.assertTrue(np.all(np.diff(children1, axis=1) >= 0))
+        self.assertTrue(np.all(children1[:, :, 0] == children1[:, :, 1]))
+        self.assertEqual(str(children1.dtype), str(arrays1.dtype))
+
+    def test_cross_population(self):
+        """Tests that all children are made from genes of their parents."""
+        user_spec_nodes = np.zeros((2, 3))
+        params = {'node_crossover_method': 'uniform_crossover',
+                  'edge_crossover_method': 'two_points_split',
+                  'property_crossover_method': 'single_point_split',
+                  'node_crossover_params': {},
+                  'edge_crossover_params': {},
+                  'property_crossover_params': {},
+                  'user_spec_nodes': user_spec_nodes}
+        population = Population(user_spec_nodes, np.random.random((20, 4, 3)),
+                                np.random.randint(6, size=(20, 8, 2)),
+                                np.random.randint(5, size=(20, 8)))
+        parents = np.random.randint(20, size=12)
+
+        children = Crossover(params).cross_population(population, parents)
+
+        self.assertEqual(len(children), 12)
+        for i in range(0, 12, 2):
+            parent1 = population[parents[i]]
+            parent2 = population[parents[i+1]]
+            for name in ('rand_nodes', 'edges', 'properties'):
+                genes1 = getattr(parent1, name)
+                genes2 = getattr(parent2, name)
+                child1 = getattr(children[i], name)
+                child2 = getattr(children[i+1], name)
+                self.assertTrue(np.all((child1 == genes1) | (child1 == genes2)))
+                self.assertTrue(np.all((child2 == genes1) | (child2 == genes2)))
+
+
 if __name__ == "__main__":
     unittest.main()
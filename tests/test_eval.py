@@ -7,8 +7,11 @@ This module implements testing for the eval class
 """
 #!/usr/bin/env python3
 import unittest
+import warnings
 import numpy as np
-from gastop import Truss, Evaluator, utilities
+import scipy.sparse
+from gastop import Truss, Evaluator, utilities, kernels
+from gastop.obstacles import Obstacles
 
 
 class TestEvaluator(unittest.TestCase):
@@ -309,6 +312,664 @@ class TestEvaluator(unittest.TestCase):
         # but member releases aren't working
 #        np.testing.assert_array_almost_equal(truss.fos, fos_true)
 
+    def test_pinned_tripod(self):
+        """Tests pin jointed solver on a symmetric tripod under vertical load"""
+
+        p = 1000  # load in newtons
+        h = 1  # height in meters
+        matl = 1
+        rand_nodes = np.array([]).reshape(0, 3)  # no random nodes
+        user_spec_nodes = np.array([[1, 0, 0],
+                                    [-1/2, np.sqrt(3)/2, 0],
+                                    [-1/2, -np.sqrt(3)/2, 0],
+                                    [0, 0, h]])
+        edges = np.array([[0, 3], [1, 3], [2, 3]])
+        properties = matl*np.ones(3, dtype=int)
+        truss = Truss(user_spec_nodes, rand_nodes, edges, properties)
+        dof = np.zeros((4, 6, 1))
+        dof[:3] = 1
+        load = np.zeros((4, 6, 1))
+        load[3, 2] = -p
+        load[3, 3] = p  # moments are ignored
+        beam_dict = utilities.beam_file_parser('gastop-config/properties.csv')
+        bdry = {'loads': load, 'fixtures': dof}
+        evaluator = Evaluator('mat_struct_analysis_pinned',
+                              'mass_basic', 'blank_test', 'cost_calc', bdry, beam_dict)
+        evaluator(truss)
+        A = beam_dict['x_section_area'][matl]
+        E = beam_dict['elastic_modulus'][matl]
+        L = np.sqrt(1 + h**2)
+        sin = h/L
+        force = p/(3*sin)  # compression in each member
+        fos_true = beam_dict['yield_strength'][matl]/(force/A)*np.ones((3, 1))
+        deflection_true = np.zeros((4, 6, 1))
+        deflection_true[3, 2] = -force*L/(E*A)/sin
+
+        np.testing.assert_array_almost_equal(truss.fos, fos_true)
+        np.testing.assert_array_almost_equal(truss.deflection, deflection_true)
+
+    def test_mechanism_screen(self):
+        """Tests trusses that are certainly mechanisms are screened before solving"""
+
+        p = 1000  # load in newtons
+        user_spec_nodes = np.array([[0, 1, 0],
+                                    [1, 0, 0],
+                                    [0, -1, 0]])
+        rand_nodes = np.array([[.5, .5, .5], [1, 0, 1], [2, 2, 2]])
+        dof = np.zeros((6, 6, 1))
+        dof[[0, 2]] = 1
+        load = np.zeros((6, 6, 1))
+        load[1, :3, 0] = [0, p, -p]
+        beam_dict = utilities.beam_file_parser('gastop-config/properties.csv')
+        bdry = {'loads': load, 'fixtures': dof}
+        frame = Evaluator('mat_struct_analysis_DSM', 'mass_basic',
+                          'blank_test', 'cost_calc', bdry, beam_dict)
+        pinned = Evaluator('mat_struct_analysis_pinned', 'mass_basic',
+                           'blank_test', 'cost_calc', bdry, beam_dict)
+
+        # stable frame, but node 4 only has 2 members when pin jointed
+        edges = np.array([[0, 1], [2, 1], [0, 3], [1, 3],
+                          [2, 3], [3, 4], [1, 4]])
+        truss = Truss(user_spec_nodes, rand_nodes, edges,
+                      np.zeros(edges.shape[0], dtype=int))
+        truss.mark_duplicates()
+        self.assertFalse(frame.screen(truss))
+        self.assertTrue(pinned.screen(truss))
+        np.testing.assert_array_equal(truss.fos, np.zeros((7, 1)))
+        np.testing.assert_array_equal(truss.deflection, np.zeros((6, 6, 1)))
+
+        # unloaded member floating away from the rest
+        edges = np.array([[0, 1], [2, 1], [0, 3], [1, 3],
+                          [2, 3], [4, 5]])
+        truss = Truss(user_spec_nodes, rand_nodes, edges,
+                      np.zeros(edges.shape[0], dtype=int))
+        frame(truss)
+        self.assertTrue(truss._screened)
+        np.testing.assert_array_equal(truss.fos, np.zeros((6, 1)))
+        self.assertGreater(truss.mass, 0)
+
+        # loaded node with no members
+        edges = np.array([[0, 3], [2, 3]])
+        truss = Truss(user_spec_nodes, rand_nodes, edges,
+                      np.zeros(edges.shape[0], dtype=int))
+        frame(truss)
+        self.assertTrue(truss._screened)
+        fos, deflection = Evaluator.mat_struct_analysis_DSM(
+            truss, bdry, beam_dict)
+        np.testing.assert_array_equal(truss.fos, fos)
+
+    def test_prune_unloaded(self):
+        """Tests pruning unloaded members gives the same results as solving them"""
+
+        p = 1000  # load in newtons
+        user_spec_nodes = np.array([[0, 1, 0],
+                                    [1, 0, 0],
+                                    [0, -1, 0]])
+        rand_nodes = np.array([[.5, .5, .5], [1, 0, 1], [1, 1, 1],
+                               [2, 1, 1], [-1, 0, 0], [-1, 0, 1]])
+        # stable frame, a dead end chain from node 3, and a floating member
+        edges = np.array([[0, 1], [2, 1], [0, 3], [1, 3], [2, 3], [3, 4],
+                          [1, 4], [0, 4], [3, 5], [5, 6], [7, 8]])
+        properties = np.zeros(edges.shape[0], dtype=int)
+        dof = np.zeros((9, 6, 1))
+        dof[[0, 2]] = 1
+        load = np.zeros((9, 6, 1))
+        load[1, :3, 0] = [0, p, -p]
+        beam_dict = utilities.beam_file_parser('gastop-config/properties.csv')
+        bdry = {'loads': load, 'fixtures': dof}
+        evaluator = Evaluator('mat_struct_analysis_DSM', 'mass_basic',
+                              'blank_test', 'cost_calc', bdry, beam_dict,
+                              prune_unloaded=True)
+
+        truss = Truss(user_spec_nodes, rand_nodes, edges, properties)
+        truss.mark_duplicates()
+        kept, chains = evaluator.prune_unloaded(truss)
+        np.testing.assert_array_equal(kept, [True]*8 + [False]*3)
+        np.testing.assert_array_equal([c[1] for c in chains], [[6], [5]])
+
+        # reference without the floating member, which makes it singular
+        reference = Truss(user_spec_nodes, rand_nodes, edges[:-1].copy(),
+                          properties[:-1])
+        reference.mark_duplicates()
+        fos_true, deflection_true = Evaluator.mat_struct_analysis_DSM(
+            reference, bdry, beam_dict)
+        self.assertTrue(np.all(fos_true > 0))
+
+        evaluator(truss)
+        np.testing.assert_array_almost_equal(truss.fos[:-1], fos_true)
+        np.testing.assert_array_almost_equal(truss.fos[-1], 1000)
+        np.testing.assert_array_almost_equal(
+            truss.deflection[:7], deflection_true[:7])
+        np.testing.assert_array_equal(truss.deflection[7:], 0)
+        self.assertAlmostEqual(truss.mass, Evaluator.mass_basic(
+            truss, beam_dict))
+
+        # loaded node without members, singular as without pruning
+        truss = Truss(user_spec_nodes, rand_nodes, edges[2:].copy(),
+                      properties[2:])
+        truss.edges[truss.edges == 1] = 8
+        evaluator(truss)
+        fos_true, deflection_true = Evaluator.mat_struct_analysis_DSM(
+            truss, bdry, beam_dict)
+        np.testing.assert_array_equal(fos_true, 0)
+        np.testing.assert_array_equal(truss.fos, fos_true)
+        np.testing.assert_array_equal(truss.deflection, deflection_true)
+
+    def test_multiple_load_cases(self):
+        """Tests straight beam under several axial loading scenarios,
+        some sharing the same fixtures and some not"""
+
+        p = np.array([1000, 2000, 3000])  # load in newtons
+        L = 2  # length in meters
+        matl = 0
+        rand_nodes = np.array([]).reshape(0, 3)  # no random nodes
+        user_spec_nodes = np.array([[0, 0, 0], [0, L, 0]])
+        edges = np.array([[0, 1]])
+        properties = np.array([matl])
+        truss = Truss(user_spec_nodes, rand_nodes, edges, properties)
+        dof = np.zeros((2, 6, 3))
+        dof[0, :, :] = 1
+        dof[1, 2, 2] = 1  # third scenario has a node fixed in z
+        load = np.zeros((2, 6, 3))
+        load[1, 1, :] = p
+        beam_dict = utilities.beam_file_parser('gastop-config/properties.csv')
+        bdry = {'loads': load, 'fixtures': dof}
+        evaluator = Evaluator('mat_struct_analysis_DSM',
+                              'mass_basic', 'blank_test', 'cost_calc', bdry, beam_dict)
+        evaluator(truss)
+        A = beam_dict['x_section_area'][matl]
+        E = beam_dict['elastic_modulus'][matl]
+        sigma = p/A
+        fos_true = beam_dict['yield_strength'][matl]/sigma
+        strain = sigma/E
+        deflection_true = np.zeros((2, 6, 3))
+        deflection_true[1, 1, :] = strain*L
+
+        np.testing.assert_array_almost_equal(truss.fos, fos_true[np.newaxis])
+        np.testing.assert_array_almost_equal(truss.deflection, deflection_true)
+
+    def test_alternate_solvers(self):
+        """Tests alternate struct solvers give same results as the reference solver"""
+
+        p = 1000  # load in newtons
+        matl = 2
+        rand_nodes = np.array([[.5, .5, .5], [1, 0, 1]])
+        user_spec_nodes = np.array([[0, 1, 0],
+                                    [1, 0, 0],
+                                    [0, -1, 0]])
+        edges = np.array([[0, 1], [2, 1], [0, 3], [1, 3],
+                          [2, 3], [3, 4], [1, 4], [0, 4]])
+        properties = matl*np.ones((edges.shape[0])).astype(int)
+        dof = np.array([[1, 1, 1, 1, 1, 1],
+                        [0, 0, 0, 0, 0, 0],
+                        [1, 1, 1, 1, 1, 1],
+                        [0, 0, 0, 0, 0, 0],
+                        [0, 0, 0, 0, 0, 0]]).reshape(5, 6, 1)
+        load = np.array([[0, 0, 0, 0, 0, 0],
+                         [0, p, -p, 0, 0, 0],
+                         [0, 0, 0, 0, 0, 0],
+                         [0, 0, 0, 0, 0, 0],
+                         [0, 0, 0, 0, 0, 0]]).reshape(5, 6, 1)
+        beam_dict = utilities.beam_file_parser('gastop-config/properties.csv')
+        bdry = {'loads': load, 'fixtures': dof}
+        truss = Truss(user_spec_nodes, rand_nodes, edges, properties)
+        truss.mark_duplicates()
+        fos_true, deflection_true = Evaluator.mat_struct_analysis_DSM(
+            truss, bdry, beam_dict)
+        self.assertTrue(np.all(fos_true > 0))
+
+        solvers = ['mat_struct_analysis_DSM_vectorized',
+                   'mat_struct_analysis_DSM_sparse',
+                   'mat_struct_analysis_DSM_banded',
+                   'mat_struct_analysis_incremental',
+                   'mat_struct_analysis_PCG']
+        for solver in solvers:
+            with self.subTest(solver=solver):
+                evaluator = Evaluator(solver, 'mass_basic', 'blank_test',
+                                      'cost_calc', bdry, beam_dict)
+                evaluator(truss)
+                np.testing.assert_array_almost_equal(truss.fos, fos_true)
+                np.testing.assert_array_almost_equal(
+                    truss.deflection, deflection_true)
+
+        # loaded floating triangle, a mechanism, solved without screening
+        mechanism = Truss(user_spec_nodes, rand_nodes,
+                          np.array([[1, 3], [3, 4], [4, 1]]), properties[:3])
+        for solver in ['mat_struct_analysis_DSM_sparse',
+                       'mat_struct_analysis_PCG']:
+            with self.subTest(solver=solver):
+                fos, deflection = getattr(Evaluator, solver)(
+                    mechanism, bdry, beam_dict)
+                np.testing.assert_array_equal(fos, 0)
+                np.testing.assert_array_equal(deflection, 0)
+
+    def test_incremental_analysis(self):
+        """Tests updating a parent's factorization gives the same results as solving"""
+
+        p = 1000  # load in newtons
+        user_spec_nodes = np.array([[0, 1, 0],
+                                    [1, 0, 0],
+                                    [0, -1, 0]])
+        np.random.seed(0)
+        rand_nodes = np.random.uniform(-1, 1, (8, 3))
+        edges = np.array([[0, 3], [1, 3], [2, 3], [0, 4], [1, 4], [2, 4],
+                          [3, 5], [4, 5], [5, 6], [3, 6], [6, 7], [4, 7],
+                          [7, 8], [5, 8], [8, 9], [6, 9], [9, 10], [7, 10],
+                          [10, 3], [8, 1], [9, 0], [10, 2]])
+        properties = np.arange(edges.shape[0]) % 5
+        dof = np.zeros((11, 6, 2))
+        dof[[0, 2]] = 1
+        load = np.zeros((11, 6, 2))
+        load[1, :3, 0] = [0, p, -p]
+        load[1, :3, 1] = [p, 0, 0]
+        beam_dict = utilities.beam_file_parser('gastop-config/properties.csv')
+        bdry = {'loads': load, 'fixtures': dof}
+
+        parent = Truss(user_spec_nodes, rand_nodes, edges.copy(), properties)
+        parent.mark_duplicates()
+        Evaluator.mat_struct_analysis_incremental(parent, bdry, beam_dict)
+
+        # change the property of one member
+        child_properties = properties.copy()
+        child_properties[8] = 4
+        child_edges = edges.copy()
+        child = Truss(user_spec_nodes, rand_nodes,
+                      child_edges, child_properties)
+        child.mark_duplicates()
+        child._factor = parent._factor
+        fos, deflection = Evaluator.mat_struct_analysis_incremental(
+            child, bdry, beam_dict)
+        fos_true, deflection_true = Evaluator.mat_struct_analysis_DSM_vectorized(
+            child, bdry, beam_dict)
+        self.assertTrue(np.all(fos_true > 0))
+        self.assertIs(child._factor, parent._factor)
+        np.testing.assert_array_almost_equal(fos, fos_true)
+        np.testing.assert_array_almost_equal(deflection, deflection_true)
+
+        # removing all members at a node changes the free dofs
+        child_edges[[16, 17, 18, 21]] = -1
+        child = Truss(user_spec_nodes, rand_nodes,
+                      child_edges, child_properties)
+        child.mark_duplicates()
+        child._factor = parent._factor
+        fos, deflection = Evaluator.mat_struct_analysis_incremental(
+            child, bdry, beam_dict)
+        fos_true, deflection_true = Evaluator.mat_struct_analysis_DSM_vectorized(
+            child, bdry, beam_dict)
+        self.assertIsNot(child._factor, parent._factor)
+        np.testing.assert_array_almost_equal(fos, fos_true)
+        np.testing.assert_array_almost_equal(deflection, deflection_true)
+
+    def test_iterative_solver(self):
+        """Tests iterative solver convergence, warm start and direct fallback"""
+
+        p = 1000  # load in newtons
+        user_spec_nodes = np.array([[0, 1, 0],
+                                    [1, 0, 0],
+                                    [0, -1, 0]])
+        np.random.seed(0)
+        rand_nodes = np.random.uniform(-1, 1, (8, 3))
+        edges = np.array([[0, 3], [1, 3], [2, 3], [0, 4], [1, 4], [2, 4],
+                          [3, 5], [4, 5], [5, 6], [3, 6], [6, 7], [4, 7],
+                          [7, 8], [5, 8], [8, 9], [6, 9], [9, 10], [7, 10],
+                          [10, 3], [8, 1], [9, 0], [10, 2]])
+        properties = np.arange(edges.shape[0]) % 5
+        dof = np.zeros((11, 6, 2))
+        dof[[0, 2]] = 1
+        load = np.zeros((11, 6, 2))
+        load[1, :3, 0] = [0, p, -p]
+        load[1, :3, 1] = [p, 0, 0]
+        beam_dict = utilities.beam_file_parser('gastop-config/properties.csv')
+        bdry = {'loads': load, 'fixtures': dof}
+        truss = Truss(user_spec_nodes, rand_nodes, edges, properties)
+        truss.mark_duplicates()
+        fos_true, deflection_true = Evaluator.mat_struct_analysis_DSM_vectorized(
+            truss, bdry, beam_dict)
+        self.assertTrue(np.all(fos_true > 0))
+
+        evaluator = Evaluator('mat_struct_analysis_PCG', 'mass_basic',
+                              'blank_test', 'cost_calc', bdry, beam_dict,
+                              struct_solver_params={'tol': 1e-12})
+        evaluator(truss)
+        np.testing.assert_array_almost_equal(truss.fos, fos_true)
+        np.testing.assert_array_almost_equal(
+            truss.deflection, deflection_true)
+        cold_iterations = truss._solver_iterations
+        self.assertTrue(np.all(cold_iterations > 0))
+
+        # starting from the solution should take fewer iterations
+        truss._parent_deflection = deflection_true
+        evaluator(truss)
+        np.testing.assert_array_almost_equal(
+            truss.deflection, deflection_true)
+        self.assertTrue(np.all(truss._solver_iterations < cold_iterations))
+
+        # unconverged scenarios are solved directly
+        del truss._parent_deflection
+        evaluator.struct_solver_params['maxiter'] = 1
+        evaluator(truss)
+        np.testing.assert_array_almost_equal(
+            truss.deflection, deflection_true)
+        self.assertTrue(np.all(truss._solver_iterations == 1))
+
+        # one scenario converging while another runs out of iterations
+        K = scipy.sparse.diags([-np.ones(9), 4*np.ones(10), -np.ones(9)],
+                               [-1, 0, 1], format='csr')
+        x = np.random.random((10, 2))
+        X0 = np.zeros((10, 2))
+        X0[:, 0] = x[:, 0]
+        X, iterations, converged = Evaluator._pcg(K, K @ x, X0, 1e-12, 2)
+        np.testing.assert_array_almost_equal(X[:, 0], x[:, 0])
+        np.testing.assert_array_equal(iterations, [0, 2])
+        np.testing.assert_array_equal(converged, [True, False])
+
+    def test_evaluation_cache(self):
+        """Tests cached results match solved results and old ones are evicted"""
+
+        p = 1000  # load in newtons
+        user_spec_nodes = np.array([[0, 1, 0],
+                                    [1, 0, 0],
+                                    [0, -1, 0]])
+        edges = np.array([[0, 1], [2, 1], [0, 3], [1, 3],
+                          [2, 3], [3, 4], [1, 4], [0, 4]])
+        dof = np.array([[1, 1, 1, 1, 1, 1],
+                        [0, 0, 0, 0, 0, 0],
+                        [1, 1, 1, 1, 1, 1],
+                        [0, 0, 0, 0, 0, 0],
+                        [0, 0, 0, 0, 0, 0]]).reshape(5, 6, 1)
+        load = np.array([[0, 0, 0, 0, 0, 0],
+                         [0, p, -p, 0, 0, 0],
+                         [0, 0, 0, 0, 0, 0],
+                         [0, 0, 0, 0, 0, 0],
+                         [0, 0, 0, 0, 0, 0]]).reshape(5, 6, 1)
+        beam_dict = utilities.beam_file_parser('gastop-config/properties.csv')
+        bdry = {'loads': load, 'fixtures': dof}
+        evaluator = Evaluator('mat_struct_analysis_DSM', 'mass_basic',
+                              'blank_test', 'cost_calc', bdry, beam_dict,
+                              cache_size=1)
+
+        rand_nodes = np.array([[1, 1, 1], [-1, 1, 1]])
+        properties = np.arange(edges.shape[0]) % 5
+        truss = Truss(user_spec_nodes, rand_nodes, edges.copy(), properties)
+        evaluator(truss)
+        # same truss with edges reversed and in a different order
+        order = np.arange(edges.shape[0])[::-1]
+        same_truss = Truss(user_spec_nodes, rand_nodes,
+                           np.fliplr(edges[order]).copy(), properties[order])
+        self.assertTrue(evaluator.cache_lookup(same_truss))
+        self.assertEqual(evaluator.cache_hits, 1)
+        self.assertEqual(evaluator.cache_misses, 1)
+        np.testing.assert_array_almost_equal(same_truss.fos, truss.fos[order])
+        np.testing.assert_array_almost_equal(
+            same_truss.deflection, truss.deflection)
+        self.assertEqual(same_truss.mass, truss.mass)
+        self.assertEqual(same_truss.cost, truss.cost)
+
+        # fill the cache past its limit, the first truss should be evicted
+        np.random.seed(0)
+        population = [Truss(user_spec_nodes, np.random.uniform(-1, 1, (2, 3)),
+                            edges.copy(), properties) for i in range(3000)]
+        evaluator.evaluate_batch(population)
+        self.assertLessEqual(evaluator._cache_bytes, 2**20)
+        self.assertFalse(evaluator.cache_lookup(same_truss))
+
+    def test_evaluate_batch(self):
+        """Tests batch evaluation gives same results as evaluating one at a time"""
+
+        p = 1000  # load in newtons
+        user_spec_nodes = np.array([[0, 1, 0],
+                                    [1, 0, 0],
+                                    [0, -1, 0]])
+        edges = np.array([[0, 1], [2, 1], [0, 3], [1, 3],
+                          [2, 3], [3, 4], [1, 4], [0, 4]])
+        dof = np.array([[1, 1, 1, 1, 1, 1],
+                        [0, 0, 0, 0, 0, 0],
+                        [1, 1, 1, 1, 1, 1],
+                        [0, 0, 0, 0, 0, 0],
+                        [0, 0, 0, 0, 0, 0]]).reshape(5, 6, 1)
+        load = np.array([[0, 0, 0, 0, 0, 0],
+                         [0, p, -p, 0, 0, 0],
+                         [0, 0, 0, 0, 0, 0],
+                         [0, 0, 0, 0, 0, 0],
+                         [0, 0, 0, 0, 0, 0]]).reshape(5, 6, 1)
+        beam_dict = utilities.beam_file_parser('gastop-config/properties.csv')
+        bdry = {'loads': load, 'fixtures': dof}
+        evaluator = Evaluator('mat_struct_analysis_DSM',
+                              'mass_basic', 'blank_test', 'cost_calc', bdry, beam_dict)
+
+        np.random.seed(0)
+        population = []
+        for i in range(10):
+            rand_nodes = np.random.uniform(-1, 1, (2, 3))
+            properties = np.random.randint(5, size=edges.shape[0])
+            population.append(
+                Truss(user_spec_nodes, rand_nodes, edges.copy(), properties))
+        # unconnected load, should be singular
+        population.append(Truss(user_spec_nodes, rand_nodes,
+                                edges[5:6].copy(), properties[5:6]))
+        population.append(Truss(user_spec_nodes, rand_nodes,
+                                -np.ones((1, 2), dtype=int), properties[:1]))
+        # loaded node only connected to free nodes, a mechanism
+        population.append(Truss(user_spec_nodes, rand_nodes,
+                                np.array([[1, 3], [3, 4], [4, 1]]),
+                                properties[:3]))
+
+        evaluator.evaluate_batch(population, batch_size=4)
+
+        for truss in population:
+            fos_true, deflection_true = Evaluator.mat_struct_analysis_DSM(
+                truss, bdry, beam_dict)
+            np.testing.assert_array_almost_equal(truss.fos, fos_true)
+            np.testing.assert_array_almost_equal(
+                truss.deflection, deflection_true)
+            np.testing.assert_almost_equal(
+                truss.mass, Evaluator.mass_basic(truss, beam_dict))
+            np.testing.assert_almost_equal(
+                truss.cost, Evaluator.cost_calc(truss, beam_dict))
+        self.assertTrue(np.all(population[0].fos > 0))
+        self.assertTrue(np.all(population[10].fos == 0))
+        self.assertTrue(np.all(population[12].fos == 0))
+
+    def test_compiled_kernels(self):
+        """Tests compiled kernels give same results as the NumPy versions"""
+
+        p = 1000  # load in newtons
+        user_spec_nodes = np.array([[0, 1, 0],
+                                    [1, 0, 0],
+                                    [0, -1, 0]])
+        np.random.seed(0)
+        rand_nodes = np.random.uniform(-1, 1, (8, 3))
+        edges = np.array([[0, 3], [1, 3], [2, 3], [0, 4], [1, 4], [2, 4],
+                          [3, 5], [4, 5], [5, 6], [3, 6], [6, 7], [4, 7],
+                          [7, 8], [5, 8], [8, 9], [6, 9], [9, 10], [7, 10],
+                          [10, 3], [8, 1], [9, 0], [10, 2]])
+        properties = np.arange(edges.shape[0]) % 5
+        dof = np.zeros((11, 6, 2))
+        dof[[0, 2]] = 1
+        load = np.zeros((11, 6, 2))
+        load[1, :3, 0] = [0, p, -p]
+        load[1, :3, 1] = [p, 0, 0]
+        beam_dict = utilities.beam_file_parser('gastop-config/properties.csv')
+        bdry = {'loads': load, 'fixtures': dof}
+        truss = Truss(user_spec_nodes, rand_nodes, edges, properties)
+        truss.mark_duplicates()
+
+        # without numba the kernels run as plain python
+        solvers = ['mat_struct_analysis_DSM',
+                   'mat_struct_analysis_DSM_vectorized',
+                   'mat_struct_analysis_pinned',
+                   'mat_struct_analysis_incremental']
+        for solver in solvers:
+            with self.subTest(solver=solver):
+                fos_true, deflection_true = getattr(Evaluator, solver)(
+                    truss, bdry, beam_dict)
+                fos, deflection = getattr(Evaluator, solver)(
+                    truss, bdry, beam_dict, jit=True)
+                np.testing.assert_array_almost_equal(fos, fos_true)
+                np.testing.assert_array_almost_equal(
+                    deflection, deflection_true)
+        self.assertTrue(np.all(fos_true > 0))
+        self.assertAlmostEqual(Evaluator.mass_basic(truss, beam_dict, jit=True),
+                               Evaluator.mass_basic(truss, beam_dict))
+
+        # falls back to numpy if numba isn't installed
+        with warnings.catch_warnings(record=True) as w:
+            warnings.simplefilter('always')
+            evaluator = Evaluator('mat_struct_analysis_DSM',
+                                  'mass_basic', 'blank_test', 'cost_calc',
+                                  bdry, beam_dict, jit=True)
+        self.assertEqual(evaluator.jit, kernels.HAS_NUMBA)
+        self.assertEqual(evaluator.struct_solver_params.get('jit', False),
+                         kernels.HAS_NUMBA)
+        self.assertEqual(len(w), 0 if kernels.HAS_NUMBA else 1)
+        evaluator(truss)
+        np.testing.assert_array_almost_equal(truss.fos, fos_true)
+
+    def test_shared_geometry(self):
+        """Tests member geometry is computed once per evaluation and discarded after"""
+
+        user_spec_nodes = np.array([[0, 0, 0], [1, 0, 0]])
+        rand_nodes = np.array([[0, 0, 2], [0, 3, 0]])
+        edges = np.array([[0, 1], [0, 2], [-1, -1], [1, 3]])
+        properties = np.array([0, 1, 2, 3])
+        beam_dict = utilities.beam_file_parser('gastop-config/properties.csv')
+        truss = Truss(user_spec_nodes, rand_nodes, edges, properties)
+
+        geometry = Evaluator.geometry(truss, beam_dict)
+        self.assertIs(Evaluator.geometry(truss, beam_dict), geometry)
+        np.testing.assert_array_equal(geometry['con'], [[0, 1], [0, 2], [1, 3]])
+        np.testing.assert_array_almost_equal(geometry['L'], [1, 2, np.sqrt(10)])
+        np.testing.assert_array_almost_equal(
+            geometry['cosines'], [[1, 0, 0], [0, 0, 1], [-1, 3, 0]/np.sqrt(10)])
+        np.testing.assert_array_equal(geometry['props']['density'],
+                                      beam_dict['density'][[0, 1, 3]])
+
+        bdry = {'loads': np.zeros((4, 6, 1)), 'fixtures': np.ones((4, 6, 1))}
+        evaluator = Evaluator('mat_struct_analysis_DSM_vectorized', 'mass_basic',
+                              'blank_test', 'cost_calc', bdry, beam_dict)
+        evaluator(truss)
+        self.assertFalse(hasattr(truss, '_geometry'))
+        self.assertAlmostEqual(truss.mass, np.sum(
+            geometry['L']*geometry['props']['x_section_area'] *
+            geometry['props']['density']))
+
+        # geometry left by calling a solver directly isn't reused once
+        # duplicate members are marked
+        truss = Truss(user_spec_nodes, rand_nodes,
+                      np.array([[0, 1], [0, 2], [1, 0], [1, 3]]), properties)
+        mass_duplicates = Evaluator.mass_basic(truss, beam_dict)
+        evaluator(truss)
+        self.assertEqual(truss.fos.shape, (3, 1))
+        self.assertAlmostEqual(truss.mass, np.sum(
+            geometry['L']*geometry['props']['x_section_area'] *
+            geometry['props']['density']))
+        self.assertGreater(mass_duplicates, truss.mass)
+        other = dict(beam_dict, density=2*beam_dict['density'])
+        self.assertAlmostEqual(Evaluator.mass_basic(truss, other),
+                               2*truss.mass)
+
+    def test_interference_ray_tracing(self):
+        """Tests counting members that cross boxes, spheres and meshes"""
+
+        # tetrahedron around (3, 0, 0)
+        v = np.array([[2, -1, -1], [4, -1, -1], [3, 1, -1], [3, 0, 1]])
+        triangles = v[[[0, 1, 2], [0, 1, 3], [1, 2, 3], [0, 2, 3]]]
+        obstacles = {'boxes': np.array([[[-1, -1, -1], [0, .5, 1]]]),
+                     'spheres': np.array([[0, 3, 0, .5]]),
+                     'triangles': triangles}
+        user_spec_nodes = np.array([[-2, 0, 0], [-.5, 0, 0], [0, 2, 0],
+                                    [3, 0, -.5], [3, 0, 0], [0, 5, 5]])
+        rand_nodes = np.array([[-2, 3, 0], [2, 3, 0]])
+        edges = np.array([[0, 1],   # ends inside box
+                          [0, 2],   # passes outside box
+                          [6, 7],   # through sphere
+                          [3, 4],   # inside tetrahedron
+                          [2, 4],   # crosses tetrahedron
+                          [5, 2],   # clear of everything
+                          [-1, -1]])
+        properties = np.zeros(edges.shape[0], dtype=int)
+        truss = Truss(user_spec_nodes, rand_nodes, edges, properties)
+        beam_dict = utilities.beam_file_parser('gastop-config/properties.csv')
+        bdry = {'loads': np.zeros((8, 6, 1)), 'fixtures': np.ones((8, 6, 1))}
+        evaluator = Evaluator('mat_struct_analysis_DSM', 'mass_basic',
+                              'interference_ray_tracing', 'cost_calc',
+                              bdry, beam_dict,
+                              interferences_solver_params={'obstacles': obstacles})
+        evaluator(truss)
+        self.assertEqual(truss.interference, 4)
+
+        # hollow meshes only interfere where members cross them
+        hit = Obstacles(triangles=triangles, solid_meshes=False).intersects(
+            user_spec_nodes[[3, 2]], user_spec_nodes[[4, 4]])
+        np.testing.assert_array_equal(hit, [False, True])
+
+        # nested solid meshes don't cancel each other out
+        nested = np.concatenate((triangles, 3*(triangles - [3, 0, 0]) + [3, 0, 0]))
+        hit = Obstacles(triangles=nested).intersects(user_spec_nodes[[3, 5]],
+                                                     user_spec_nodes[[4, 5]])
+        np.testing.assert_array_equal(hit, [True, False])
+        np.testing.assert_array_equal(Obstacles(triangles=nested).meshes,
+                                      [0]*4 + [1]*4)
+
+        # hierarchy gives the same result as checking every obstacle
+        np.random.seed(0)
+        centers = np.random.uniform(-5, 5, (300, 3))
+        triangles = centers[:, np.newaxis] + np.random.uniform(-.5, .5, (300, 3, 3))
+        corners = np.random.uniform(-5, 5, (20, 1, 3))
+        boxes = np.concatenate((corners, corners + np.random.uniform(0, 1, (20, 1, 3))),
+                               axis=1)
+        spheres = np.hstack((np.random.uniform(-5, 5, (20, 3)),
+                             np.random.uniform(0, .5, (20, 1))))
+        p0 = np.random.uniform(-5, 5, (200, 3))
+        p1 = p0 + np.random.uniform(-2, 2, (200, 3))
+        hit = Obstacles(boxes, spheres, triangles, False).intersects(p0, p1)
+        hit_all = Obstacles(boxes, spheres, triangles, False,
+                            leaf_size=1000).intersects(p0, p1)
+        self.assertTrue(np.any(hit))
+        np.testing.assert_array_equal(hit, hit_all)
+
+    def test_member_crossings(self):
+        """Tests finding crossing and nearby member pairs"""
+
+        user_spec_nodes = np.array([[0, 0, 0], [2, 2, 0], [0, 2, 0], [2, 0, 0]])
+        rand_nodes = np.array([[0, 0, .1], [2, 0, .1], [5, 5, 5]])
+        edges = np.array([[0, 1],   # crosses [2, 3]
+                          [2, 3],
+                          [4, 5],   # 0.1 above [0, 3] and its end nodes
+                          [0, 3],
+                          [0, 2],   # meets others only at nodes
+                          [1, 6]])
+        properties = np.zeros(edges.shape[0], dtype=int)
+        truss = Truss(user_spec_nodes, rand_nodes, edges, properties)
+        crossings = Evaluator.member_crossings(truss)
+        self.assertEqual(crossings['count'], 1)
+        self.assertAlmostEqual(crossings['min_clearance'], 0)
+        crossings = Evaluator.member_crossings(truss, clearance=.2)
+        self.assertEqual(crossings['count'], 5)
+
+        beam_dict = utilities.beam_file_parser('gastop-config/properties.csv')
+        bdry = {'loads': np.zeros((7, 6, 1)), 'fixtures': np.ones((7, 6, 1))}
+        evaluator = Evaluator('mat_struct_analysis_DSM', 'mass_basic',
+                              'blank_test', 'cost_calc', bdry, beam_dict,
+                              crossing_clearance=.05)
+        evaluator(truss)
+        self.assertEqual(truss.crossings['count'], 1)
+
+        # same pairs as checking all of them
+        np.random.seed(0)
+        nodes = np.random.uniform(0, 10, (60, 3))
+        edges = np.random.randint(60, size=(150, 2))
+        truss = Truss(nodes[:0], nodes, edges, np.zeros(150, dtype=int))
+        truss.mark_duplicates()
+        nodes, con, _ = truss.cleaned_params()
+        a, b = np.triu_indices(con.shape[0], 1)
+        apart = np.all(con[a, :, np.newaxis] != con[b, np.newaxis, :], axis=(1, 2))
+        a, b = a[apart], b[apart]
+        distance = Evaluator._segment_distance(nodes[con[a, 0]], nodes[con[a, 1]],
+                                               nodes[con[b, 0]], nodes[con[b, 1]])
+        crossings = Evaluator.member_crossings(truss, clearance=.5)
+        self.assertEqual(crossings['count'], np.sum(distance < .5))
+        self.assertGreater(crossings['count'], 0)
 
 if __name__ == '__main__':
     unittest.main()
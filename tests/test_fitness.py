@@ -43,6 +43,18 @@ class TestFitness(unittest.TestCase):
         t0 = f(t0)
         self.assertAlmostEqual(t0.fitness_score, 185)
 
+        # members interfering with obstacles
+        fitness_params['w_interference'] = 20
+        t0.interference = 2
+        t0 = f(t0)
+        self.assertAlmostEqual(t0.fitness_score, 225)
+
+        # crossing member pairs
+        fitness_params['w_crossing'] = 5
+        t0.crossings = {'count': 3, 'min_clearance': 0.}
+        t0 = f(t0)
+        self.assertAlmostEqual(t0.fitness_score, 240)
+
     def test_sphere(self):
         """Tests to make sure min is where it should be."""
 
@@ -51,6 +51,24 @@ class TestGenAlg_Cristian(unittest.TestCase):  # Cristian
             self.assertTrue(isinstance(truss.edges, np.ndarray))
             self.assertTrue(isinstance(truss.properties, np.ndarray))
 
+    def testFactorsOnlyKeptForMutation(self):
+        '''Tests that only mutation children keep a factorization.
+        '''
+        ga = GenAlg(init_file_path)
+        ga.initialize_population(100)
+        for i, truss in enumerate(ga.population):
+            truss.fitness_score = np.random.random()
+            truss._factor = i
+        ga.population.sort()
+        ga.update_population()
+
+        num_elite = ga.ga_params['num_elite']
+        factors = [p.get('_factor') if p else None
+                   for p in ga.population.private]
+        num_mutation = round((100 - num_elite)*ga.ga_params['percent_mutation'])
+        self.assertTrue(all(f is None for f in factors[:num_elite]))
+        self.assertEqual(sum(f is not None for f in factors), num_mutation)
+
     def testSaveLoadState(self):
         '''Tests that config and population can be saved to and loaded from
         JSON files.
@@ -109,6 +127,26 @@ class TestGenAlg_Dan(unittest.TestCase):
                 self.assertTrue(node[2] < ga.random_params['domain'][1, 2])
 
 
+    def test_generate_random_batch(self):
+        """Tests that batches of random trusses have the right shapes.
+        """
+        ga = GenAlg(config)
+        population = ga.generate_random_batch(50)
+        num_rand_nodes = ga.random_params['num_rand_nodes']
+        num_rand_edges = ga.random_params['num_rand_edges']
+        num_nodes = num_rand_nodes + ga.random_params['user_spec_nodes'].shape[0]
+
+        self.assertEqual(population.rand_nodes.shape, (50, num_rand_nodes, 3))
+        self.assertEqual(population.edges.shape, (50, num_rand_edges, 2))
+        self.assertEqual(population.properties.shape, (50, num_rand_edges))
+        self.assertTrue(np.all(population.rand_nodes >= ga.random_params['domain'][0]))
+        self.assertTrue(np.all(population.rand_nodes < ga.random_params['domain'][1]))
+        self.assertTrue(np.all((population.edges >= 0) & (population.edges < num_nodes)))
+        self.assertTrue(np.all(population.properties <
+                               ga.random_params['num_material_options']))
+        self.assertEqual(len(ga.generate_random_batch(0)), 0)
+
+
 class TestGenAlg_SFR(unittest.TestCase):
     """Tests user updating aspects of GenAlg class.  This includes the ProgMon
     class and progress bars used in genalg.
@@ -261,6 +299,28 @@ class TestGenAlgRC(unittest.TestCase):
         ga.run(num_generations=2)
         self.assertAlmostEqual(len(ga.population), 100)
 
+    def testParallelResults(self):
+        """Tests that compact results from worker processes match serial runs"""
+
+        populations = []
+        best = []
+        for num_threads in (1, 2):
+            config = utilities.init_file_parser(init_file_path)
+            ga = GenAlg(config)
+            ga.initialize_population(50)
+            best.append(ga.run(num_generations=2, num_threads=num_threads)[0])
+            populations.append(ga.population)
+
+        np.testing.assert_allclose(populations[0].fitness_score,
+                                   populations[1].fitness_score)
+        np.testing.assert_allclose(populations[0].min_fos,
+                                   populations[1].min_fos)
+        np.testing.assert_array_equal(populations[0].edges,
+                                      populations[1].edges)
+        # the best truss has full results, to be plotted and printed
+        np.testing.assert_allclose(best[0].fos, best[1].fos)
+        np.testing.assert_allclose(best[0].deflection, best[1].deflection)
+
 
 if __name__ == "__main__":
     unittest.main()
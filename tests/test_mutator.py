@@ -10,7 +10,7 @@ This module implements testing for the Mutator class
 import unittest
 import numpy as np
 
-from gastop import Mutator
+from gastop import Mutator, Population
 
 
 class TestMutator_pseudo_bit_flip(unittest.TestCase):  # Amlan
@@ -79,5 +79,92 @@ class TestMutator_gaussian(unittest.TestCase):  # Paul
         np.testing.assert_string_equal(str(child.dtype), str(check.dtype))
 
 
+class TestMutator_population(unittest.TestCase):
+    """Tests the population-level mutation methods of the Mutator class."""
+
+    def test_shuffle_index(self):
+        """Tests that each child is a permutation of its own parent."""
+        arrays = np.random.randint(100, size=(30, 10, 2))
+        children = Mutator.shuffle_index_population(arrays)
+
+        self.assertEqual(children.shape, arrays.shape)
+        np.testing.assert_array_equal(
+            np.sort(children.reshape(30, -1), axis=1),
+            np.sort(arrays.reshape(30, -1), axis=1))
+
+    def test_gaussian(self):
+        """Tests bounds, int_flag and independent noise of each child."""
+        boundaries = np.array([[0, -10, -5], [10, 0, 5]])
+        arrays = np.random.uniform(boundaries[0], boundaries[1], (50, 10, 3))
+        arrays[1] = arrays[0]
+        children = Mutator.gaussian_population(arrays, [0.5, 1, 2], boundaries,
+                                               False)
+
+        self.assertEqual(children.shape, arrays.shape)
+        self.assertTrue(np.all((children >= boundaries[0]) &
+                               (children <= boundaries[1])))
+        # parents with the same arrays still get their own mutations
+        self.assertTrue(np.all(children[0] != children[1]))
+        # std is applied along the last axis
+        change = np.abs(children - arrays)
+        change = np.minimum(change, boundaries[1] - boundaries[0] - change)
+        np.testing.assert_allclose(np.sqrt(np.mean(change**2, axis=(0, 1))),
+                                   [0.5, 1, 2], rtol=0.2)
+
+        children = Mutator.gaussian_population(arrays, 2, boundaries, True)
+        self.assertTrue(np.issubdtype(children.dtype, np.integer))
+        self.assertTrue(np.all((children >= boundaries[0]) &
+                               (children <= boundaries[1])))
+
+    def test_pseudo_bit_flip(self):
+        """Tests bounds, int_flag and the proportion flipped in each child."""
+        boundaries = np.array([[-1, -1], [6, 6]])
+        # parents outside the boundaries, so flipped elements can be told apart
+        arrays = np.full((40, 500, 2), 10)
+        children = Mutator.pseudo_bit_flip_population(arrays, boundaries, 0.3,
+                                                      True)
+
+        self.assertEqual(children.shape, arrays.shape)
+        self.assertTrue(np.issubdtype(children.dtype, np.integer))
+        flipped = children != arrays
+        self.assertTrue(np.all((children[flipped] >= -1) &
+                               (children[flipped] < 6)))
+        np.testing.assert_allclose(flipped.mean(axis=(1, 2)), 0.3, atol=0.075)
+
+        children = Mutator.pseudo_bit_flip_population(arrays, boundaries, 0.,
+                                                      False)
+        np.testing.assert_array_equal(children, arrays)
+        children = Mutator.pseudo_bit_flip_population(arrays, boundaries, 1.,
+                                                      False)
+        self.assertTrue(np.all((children >= -1) & (children <= 6)))
+
+    def test_mutate_population(self):
+        """Tests that children of each parent stay in the boundaries."""
+        user_spec_nodes = np.zeros((2, 3))
+        boundaries = np.array([[0, 0, 0], [1, 1, 1]])
+        params = {'node_mutator_method': 'gaussian',
+                  'edge_mutator_method': 'pseudo_bit_flip',
+                  'property_mutator_method': 'shuffle_index',
+                  'node_mutator_params': {'std': 0.1, 'boundaries': boundaries,
+                                          'int_flag': False},
+                  'edge_mutator_params': {'boundaries': np.array([[-1, -1], [6, 6]]),
+                                          'proportions': 0.5, 'int_flag': True},
+                  'property_mutator_params': {},
+                  'user_spec_nodes': user_spec_nodes}
+        population = Population(user_spec_nodes, np.random.random((20, 4, 3)),
+                                np.random.randint(6, size=(20, 8, 2)),
+                                np.random.randint(5, size=(20, 8)))
+        parents = np.random.randint(20, size=15)
+
+        children = Mutator(params).mutate_population(population, parents)
+
+        self.assertEqual(len(children), 15)
+        self.assertTrue(np.all((children.rand_nodes >= 0) &
+                               (children.rand_nodes <= 1)))
+        self.assertTrue(np.all((children.edges >= -1) & (children.edges < 6)))
+        np.testing.assert_array_equal(np.sort(children.properties, axis=1),
+                                      np.sort(population.properties[parents], axis=1))
+
+
 if __name__ == '__main__':
     unittest.main()
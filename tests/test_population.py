@@ -0,0 +1,110 @@
+"""test_population.py
+This file is a part of the testing scripts for GASTOp
+Authors: Amlan Sinha, Cristian Lacey, Daniel Shaw, Paul Kaneelil, Rory Conlin, Susan Redmond
+Licensed under GNU GPLv3.
+This module implements testing for the Population class
+
+"""
+#!/usr/bin/env python3
+
+import unittest
+import pickle
+import numpy as np
+
+from gastop import Population, Truss
+
+
+def random_trusses(pop_size):
+    user_spec_nodes = np.array([[0, 0, 0], [1, 0, 0]])
+    return [Truss(user_spec_nodes, np.random.random((3, 3)),
+                  np.random.randint(5, size=(6, 2)),
+                  np.random.randint(4, size=6)) for i in range(pop_size)]
+
+
+class TestPopulation(unittest.TestCase):
+    def testFromTrusses(self):
+        """Tests that a population stores the trusses as stacked arrays."""
+
+        trusses = random_trusses(10)
+        trusses[3].fitness_score = 2.5
+        trusses[3].fos = np.array([[3., 1.5], [2., 4.]])
+        trusses[3]._factor = 'factor'
+        population = Population.from_trusses(trusses)
+
+        self.assertEqual(len(population), 10)
+        self.assertEqual(population.rand_nodes.shape, (10, 3, 3))
+        self.assertEqual(population.edges.shape, (10, 6, 2))
+        self.assertEqual(population.properties.shape, (10, 6))
+        np.testing.assert_array_equal(population.edges[3], trusses[3].edges)
+        self.assertEqual(population.fitness_score[3], 2.5)
+        self.assertEqual(population.min_fos[3], 1.5)
+        self.assertTrue(np.isnan(population.mass[3]))
+
+        truss = population[3]
+        self.assertTrue(isinstance(truss, Truss))
+        self.assertEqual(truss.fitness_score, 2.5)
+        self.assertIsNone(truss.mass)
+        self.assertEqual(truss._factor, 'factor')
+        self.assertEqual(str(population[5]), str(trusses[5]))
+
+    def testViews(self):
+        """Tests that changes to a view are stored in the population."""
+
+        population = Population.from_trusses(random_trusses(5))
+        truss = population[-1]
+        truss.edges[0] = -1
+        truss.mass = 4.
+        truss.fos = np.array([[7.]])
+        truss._screened = True
+        self.assertTrue(np.all(population.edges[4, 0] == -1))
+        self.assertEqual(population.mass[4], 4.)
+        self.assertEqual(population.min_fos[4], 7.)
+        self.assertTrue(population.private[4]['_screened'])
+
+        # copies and pickles are detached from the population
+        for copy in (truss.copy(), pickle.loads(pickle.dumps(truss))):
+            self.assertTrue(type(copy) is Truss)
+            copy.mass = 5.
+            copy.edges[1] = -1
+            self.assertEqual(copy._screened, True)
+            self.assertEqual(population.mass[4], 4.)
+            self.assertFalse(np.any(population.edges[4, 1] == -1))
+
+        # assigning a truss copies its genome and results
+        other = random_trusses(1)[0]
+        other.cost = 12.
+        population[0] = other
+        np.testing.assert_array_equal(population.rand_nodes[0],
+                                      other.rand_nodes)
+        self.assertEqual(population[0].cost, 12.)
+
+    def testSortTakeConcatenate(self):
+        """Tests sorting, slicing and joining populations."""
+
+        population = Population.from_trusses(random_trusses(20))
+        for truss in population:
+            truss.fitness_score = np.random.random()
+        population[7].fitness_score = None
+        nodes = {truss.fitness_score: truss.rand_nodes.copy()
+                 for truss in population}
+
+        population.sort()
+        scores = population.fitness_score
+        self.assertTrue(np.all(np.diff(scores[:-1]) > 0))
+        self.assertTrue(np.isnan(scores[-1]))
+        for truss in population[:-1]:
+            np.testing.assert_array_equal(truss.rand_nodes,
+                                          nodes[truss.fitness_score])
+
+        elite = population[:5]
+        self.assertEqual(len(elite), 5)
+        elite.rand_nodes[:] = 0
+        self.assertFalse(np.all(population.rand_nodes[:5] == 0))
+
+        joined = Population.concatenate((elite, population))
+        self.assertEqual(len(joined), 25)
+        np.testing.assert_array_equal(joined.fitness_score[5:], scores)
+
+
+if __name__ == '__main__':
+    unittest.main()
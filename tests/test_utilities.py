@@ -8,6 +8,8 @@ This module implements testing for the Utilities class
 #!/usr/bin/env python3
 
 import unittest
+import copy
+import pickle
 import numpy as np
 from gastop import Truss, utilities, ProgMon, GenAlg
 
@@ -83,6 +85,32 @@ class TestUtilities_Cristian(unittest.TestCase):  # Cristian
                 loaded_progress_history[gen]['Population Fitness Score Range'], float))
 
 
+class TestBeamFileParser(unittest.TestCase):
+    """Tests for parsing beam properties into a material table"""
+
+    def test_material_table(self):
+        """Tests properties are columns of one array, gathered together"""
+
+        properties = utilities.beam_file_parser('gastop-config/properties.csv')
+        self.assertEqual(properties.data.shape, (5, 12))
+        np.testing.assert_array_almost_equal(
+            properties['x_section_area'],
+            np.pi/4*(properties['outer_diameter']**2 -
+                     properties['inner_diameter']**2))
+        for name in properties:
+            self.assertTrue(np.shares_memory(properties[name], properties.data))
+
+        matl = np.array([3, 0, 3, 4])
+        members = properties.take(matl)
+        for name in properties:
+            np.testing.assert_array_equal(members[name], properties[name][matl])
+
+        for other in [copy.deepcopy(properties),
+                      pickle.loads(pickle.dumps(properties))]:
+            self.assertTrue(np.shares_memory(other['density'], other.data))
+            np.testing.assert_array_equal(other.data, properties.data)
+
+
 class TestTrussPlot(unittest.TestCase):
     """Test for plot and print methods. Doesn't assert, visual inspection used for pass/fail"""
 